@@ -0,0 +1,233 @@
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from capacity import EXCLUDED_STATUSES
+from profiler import section
+
+ORDER_DIMENSIONS = ["바이어", "복종", "카테고리", "생산국가", "수출국가", "시즌"]
+ORDER_MEASURES = ["매출($)", "영업이익($)", "수량"]
+SALES_DIMENSIONS = ["바이어", "카테고리", "판매지역"]
+SALES_MEASURES = ["판매금액($)", "판매량(Qty)"]
+SALES_MEAN_MEASURES = ["정상가판매율(%)"]
+
+
+class Cube:
+    """연도 x 분석 기준(dim) 별 합계를 미리 집계해두는 큐브.
+
+    셀 값 배열 구성: [행 수, 합계 지표..., 평균 지표 합계..., 평균 지표 건수...]
+    ColumnStore 에 subscribe 하면 추가 / 수정된 행만 반영하고, slice() 결과는 다음 변경 전까지
+    (dim, metric) 별로 캐시된다.
+    """
+
+    def __init__(self, dimensions, sums, means=(), year="연도"):
+        self.dimensions = list(dimensions)
+        self.sums = list(sums)
+        self.means = list(means)
+        self.year = year
+        self.version = 0
+        self._width = 1 + len(self.sums) + 2 * len(self.means)
+        self._cells = {d: defaultdict(lambda: np.zeros(self._width)) for d in self.dimensions}
+        self._slices = {}
+        self._lock = threading.RLock()
+
+    def _row_vector(self, store, row, sign):
+        vec = np.zeros(self._width)
+        vec[0] = sign
+        for i, name in enumerate(self.sums, start=1):
+            value = store.value(name, row)
+            vec[i] = 0.0 if value is None or np.isnan(value) else sign * value
+        base = 1 + len(self.sums)
+        for i, name in enumerate(self.means):
+            value = store.value(name, row)
+            if value is not None and not np.isnan(value):
+                vec[base + i] = sign * value
+                vec[base + len(self.means) + i] = sign
+        return vec
+
+    def _apply_row(self, store, row, sign):
+        year = store.value(self.year, row)
+        if year is None:
+            return
+        vec = self._row_vector(store, row, sign)
+        with self._lock:
+            for dim in self.dimensions:
+                member = store.value(dim, row)
+                if member is not None:
+                    cells = self._cells[dim]
+                    cells[(year, member)] += vec
+                    if cells[(year, member)][0] <= 0:
+                        del cells[(year, member)]
+            self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._slices.clear()
+
+    # --- ColumnStore listener ---
+    def on_rows_added(self, store, rows):
+        if len(rows) == 1:
+            self._apply_row(store, rows.start, 1)
+            return
+        if len(rows) == 0:
+            return
+        with section("cube_build", rows=len(rows)):
+            sl = slice(rows.start, rows.stop)
+            df = pd.DataFrame({name: store.column(name)[sl] for name in [self.year, *self.dimensions, *self.sums, *self.means]})
+            df["_n"] = 1
+            for name in self.means:
+                df[f"_c_{name}"] = df[name].notna().astype(np.int64)
+            value_cols = ["_n", *self.sums, *self.means, *[f"_c_{name}" for name in self.means]]
+            with self._lock:
+                for dim in self.dimensions:
+                    grouped = df.groupby([self.year, dim], observed=True)[value_cols].sum()
+                    cells = self._cells[dim]
+                    for key, vec in zip(grouped.index, grouped.to_numpy(dtype=np.float64)):
+                        cells[key] += vec
+                self._changed()
+
+    def on_row_discarded(self, store, row):
+        self._apply_row(store, row, -1)
+
+    # --- 조회 ---
+    def slice(self, dim, metric):
+        key = (dim, metric)
+        with self._lock:
+            if key not in self._slices:
+                with section("pivot", rows=len(self._cells[dim])):
+                    self._slices[key] = self._build_slice(dim, metric)
+            return self._slices[key]
+
+    def _build_slice(self, dim, metric):
+        cells = self._cells[dim]
+        if metric in self.sums:
+            col = 1 + self.sums.index(metric)
+            values = {k: v[col] for k, v in cells.items()}
+        else:
+            i = self.means.index(metric)
+            s, c = 1 + len(self.sums) + i, 1 + len(self.sums) + len(self.means) + i
+            values = {k: (v[s] / v[c] if v[c] else 0.0) for k, v in cells.items()}
+        if not values:
+            return pd.DataFrame()
+        pivot = pd.Series(values).unstack(fill_value=0)
+        pivot.index.name, pivot.columns.name = self.year, dim
+        return pivot.sort_index().sort_index(axis=1)
+
+
+
+SELL_THROUGH_KEYS = ["연도", "바이어", "카테고리"]
+# 셀 값 배열 구성: [오더 수, 생산수량, 오더매출, 판매 건수, 판매량, 판매금액, 정상가 판매량, 판매율이 있는 판매량]
+_ORDER_PART = ["오더 수", "생산수량", "오더매출($)"]
+_SALES_PART = ["판매 건수", "판매량(Qty)", "판매금액($)", "_정상가판매량", "_판매율 기록량"]
+
+
+def _order_values(cols):
+    # 취소 오더는 생산되지 않으므로 0 으로 더한다
+    keep = ~np.isin(np.asarray(cols["상태"], dtype=object), list(EXCLUDED_STATUSES))
+    qty = np.asarray(cols["수량"], dtype=np.float64)
+    revenue = np.nan_to_num(np.asarray(cols["매출($)"], dtype=np.float64))
+    return np.column_stack([keep, qty * keep, revenue * keep]).astype(np.float64)
+
+
+def _sales_values(cols):
+    qty = np.asarray(cols["판매량(Qty)"], dtype=np.float64)
+    amount = np.nan_to_num(np.asarray(cols["판매금액($)"], dtype=np.float64))
+    rate = np.asarray(cols["정상가판매율(%)"], dtype=np.float64)
+    rated = ~np.isnan(rate)
+    return np.column_stack([np.ones_like(qty), qty, amount, np.nan_to_num(qty * rate / 100), qty * rated])
+
+
+class SellThrough:
+    """오더와 매장 판매를 (연도, 바이어, 카테고리) 키로 미리 합쳐두는 조인 집계.
+
+    오더 저장소에는 .orders, 판매 저장소에는 .sales 를 subscribe 한다. 추가 / 수정된 행만 키 셀에 더하고 빼므로
+    table() 은 행 수와 무관하게 키 조합 수만큼만 계산하고, 결과는 다음 변경 전까지 (by, filters) 별로 캐시된다.
+    정상가 판매율은 판매량 가중 평균이다.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._width = len(_ORDER_PART) + len(_SALES_PART)
+        self._cells = defaultdict(lambda: np.zeros(self._width))
+        self._tables = {}
+        self._lock = threading.RLock()
+        self.orders = _JoinSide(self, ["상태", "수량", "매출($)"], _order_values, 0)
+        self.sales = _JoinSide(self, ["판매량(Qty)", "판매금액($)", "정상가판매율(%)"], _sales_values, len(_ORDER_PART))
+
+    def _apply(self, offset, keys, values):
+        with self._lock:
+            for key, vec in zip(keys, values):
+                cell = self._cells[key]
+                cell[offset:offset + len(vec)] += vec
+                # 생산 오더도 판매 기록도 남지 않은 키는 제거
+                if cell[0] <= 0 and cell[len(_ORDER_PART)] <= 0:
+                    del self._cells[key]
+            self.version += 1
+            self._tables.clear()
+
+    # --- 조회 ---
+    def table(self, by=("바이어", "카테고리", "연도"), filters=None):
+        """by 기준 생산 대비 판매 지표. filters: 키 컬럼 -> 허용 값 목록 (빈 목록은 전체)."""
+        filters = tuple(sorted((k, tuple(v)) for k, v in (filters or {}).items() if v))
+        key = (tuple(by), filters)
+        with self._lock:
+            if key not in self._tables:
+                with section("sell_through", rows=len(self._cells)):
+                    self._tables[key] = self._build_table(list(by), dict(filters))
+            return self._tables[key]
+
+    def _build_table(self, by, filters):
+        if not self._cells:
+            return pd.DataFrame()
+        index = pd.MultiIndex.from_tuples(list(self._cells), names=SELL_THROUGH_KEYS)
+        cells = pd.DataFrame(np.vstack(list(self._cells.values())), index=index, columns=_ORDER_PART + _SALES_PART)
+        for name, values in filters.items():
+            cells = cells[cells.index.get_level_values(name).isin(values)]
+        if cells.empty:
+            return pd.DataFrame()
+        out = cells.groupby(level=by).sum() if by else cells.sum().to_frame("전체").T
+        out["판매율(%)"] = _percent(out["판매량(Qty)"], out["생산수량"])
+        out["정상가 판매율(%)"] = _percent(out["_정상가판매량"], out["_판매율 기록량"])
+        out["판매금액 / 오더매출"] = _percent(out["판매금액($)"], out["오더매출($)"]) / 100
+        return out.drop(columns=["_정상가판매량", "_판매율 기록량"]).sort_index()
+
+
+def _percent(num, den):
+    den = den.to_numpy()
+    return pd.Series(np.divide(num.to_numpy() * 100, den, out=np.full(len(den), np.nan), where=den > 0), index=num.index)
+
+
+class _JoinSide:
+    """SellThrough 의 한쪽 입력 (ColumnStore listener). values: 컬럼 배열 dict -> [행, 셀 값] 배열."""
+
+    def __init__(self, owner, columns, values, offset):
+        self.owner = owner
+        self.columns = list(columns)
+        self.values = values
+        self.offset = offset
+
+    def _apply_row(self, store, row, sign):
+        key = tuple(store.value(name, row) for name in SELL_THROUGH_KEYS)
+        if None in key:
+            return
+        vec = self.values({name: [store.value(name, row)] for name in self.columns})
+        self.owner._apply(self.offset, [key], sign * vec)
+
+    def on_rows_added(self, store, rows):
+        if len(rows) == 1:
+            self._apply_row(store, rows.start, 1)
+            return
+        if len(rows) == 0:
+            return
+        with section("sell_through_build", rows=len(rows)):
+            sl = slice(rows.start, rows.stop)
+            values = self.values({name: store.column(name)[sl] for name in self.columns})
+            # Categorical 목록을 그대로 넘기면 키 수 == 행 수일 때 컬럼 이름으로 해석되므로 Series 로 감싼다
+            keys = [pd.Series(store.column(name)[sl], name=name) for name in SELL_THROUGH_KEYS]
+            grouped = pd.DataFrame(values).groupby(keys, observed=True).sum()
+            self.owner._apply(self.offset, list(grouped.index), grouped.to_numpy(np.float64))
+
+    def on_row_discarded(self, store, row):
+        self._apply_row(store, row, -1)
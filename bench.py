@@ -0,0 +1,219 @@
+"""opp.py 전체 재실행 성능 측정 (Streamlit AppTest 로 헤드리스 실행).
+
+오더 규모별로 임시 저장소를 만들고 주요 상호작용의 소요 시간, 섹션별 시간, 최대 메모리를
+결과 파일(JSON Lines)에 커밋 해시와 함께 기록한다. tracemalloc 은 실행 시간을 크게 늘리므로
+시간은 추적 없이 재고, 메모리는 상호작용마다 한 번 더 실행해 따로 기록한다 (traced=true).
+
+    python bench.py --sizes 1000 10000 100000 --repeat 3
+    python bench.py --compare <커밋A> <커밋B>
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opp.py")
+RESULTS_PATH = "bench_results.jsonl"
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP_PATH), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+class Session:
+    """AppTest 한 세션. step() 마다 소요 시간과 섹션별 시간을 잰다."""
+
+    def __init__(self, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def step(self, action=None, traced=False):
+        from profiler import RECORDER
+        if action is not None:
+            action(self.at)
+        mark = RECORDER.mark()
+        with measure(traced) as result:
+            self.at.run()
+        if self.at.exception:
+            raise RuntimeError(f"app raised: {self.at.exception[0].value}")
+        sections = defaultdict(float)
+        for sample in RECORDER.samples_since(mark):
+            sections[sample["section"]] += sample["seconds"]
+        result["sections"] = dict(sections)
+        return result
+
+
+@contextmanager
+def measure(traced):
+    # 섹션들이 reset_peak() 를 쓰므로 최대 메모리는 profiler.peak_memory 로 잰다
+    from profiler import peak_memory
+    result = {"wall_s": None, "peak_mb": None, "traced": traced}
+    was_tracing = tracemalloc.is_tracing()
+    if traced and not was_tracing:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with peak_memory() if traced else nullcontext({"kb": None}) as mem:
+            yield result
+    finally:
+        result["wall_s"] = time.perf_counter() - start
+        if traced:
+            result["peak_mb"] = mem["kb"] / 1024 if mem["kb"] is not None else None
+            if not was_tracing:
+                tracemalloc.stop()
+
+
+def repeat(session, name, action, times, traced):
+    results = [(name, session.step(action)) for _ in range(times)]
+    if traced:
+        results.append((name, session.step(action, traced=True)))
+    return results
+
+
+# --- 측정할 상호작용 ---
+def change_criteria(at):
+    box = _widget(at.selectbox, "📊 분석 기준 선택 (오더)")
+    box.set_value("복종" if box.value != "복종" else "바이어")
+
+
+def fill_order_form(at):
+    _widget(at.text_input, "바이어 (Buyer)").input("BenchBuyer")
+    _widget(at.text_input, "1.오더명").input("B-1")
+    _widget(at.number_input, "수량 (Q'ty)").set_value(1200)
+    _widget(at.number_input, "단가 ($ Unit Price)").set_value(9.5)
+    _widget(at.number_input, "1.원사 ($)").set_value(1.2)
+
+
+def click_register(at):
+    next(b for b in at.button if "오더 등록" in b.label).click()
+
+
+def admin_login(at):
+    _widget(at.text_input, "관리자 비밀번호").input("1452")
+
+
+def edit_capa(at):
+    box = _widget(at.number_input, "베트남(VNM) 본공장")
+    box.set_value(box.value + 1)
+
+
+def time_exports(url, traced):
+    # AppTest 는 다운로드 버튼을 누를 수 없으므로 같은 데이터로 export 경로를 직접 호출
+    from storage import SharedData
+    from exports import available_formats, exporter
+    data = SharedData.open(url)
+    jobs = {
+        "order_list": (lambda: data.orders.frame(), False),
+        "order_pivot": (lambda: data.order_cube.slice("바이어", "매출($)"), True),
+        "sales_pivot": (lambda: data.sales_cube.slice("바이어", "판매금액($)"), True),
+    }
+    results = []
+    for name, (build, index) in jobs.items():
+        for fmt in available_formats():
+            for trace in ([False, True] if traced else [False]):
+                fn = exporter((f"bench_{name}", time.time_ns()), build, fmt, index=index)
+                for label in ("cold", "cached"):
+                    with measure(trace) as result:
+                        fn()
+                    results.append((f"export_{name}_{fmt}_{label}", {**result, "sections": {}}))
+    return results
+
+
+def fresh_storage(size, args):
+    # 새 임시 저장소를 지정하고 공유 데이터 캐시를 비움 (다음 실행이 처음부터 적재 / 생성)
+    import streamlit as st
+    tmp = tempfile.mkdtemp(prefix="opp_bench_")
+    url = "sqlite:///" + os.path.join(tmp, "bench.sqlite3")
+    os.environ.update({
+        "OPP_STORAGE": url, "OPP_MOCK_ORDERS": str(size), "OPP_MOCK_SALES": str(max(size // 2, 1)),
+        "OPP_MOCK_SEED": str(args.seed), "OPP_FX_PROVIDER": "simulated",
+        "OPP_FX_HISTORY": os.path.join(tmp, "fx.sqlite3"),
+    })
+    st.cache_resource.clear()
+    return url
+
+
+def run_size(size, args):
+    if args.memory:
+        # 메모리용 cold start 는 별도 저장소에서 따로 실행 (시간 측정에는 추적을 끈 실행만 사용)
+        fresh_storage(size, args)
+        traced_cold = [("cold_start", Session(args.timeout).step(traced=True))]
+    else:
+        traced_cold = []
+    url = fresh_storage(size, args)
+    session = Session(args.timeout)
+    results = [("cold_start", session.step())] + traced_cold
+    results += repeat(session, "warm_rerun", None, args.repeat, args.memory)
+    results += repeat(session, "change_criteria", change_criteria, args.repeat, args.memory)
+    session.step(fill_order_form)
+    results += repeat(session, "register_order", click_register, args.repeat, args.memory)
+    session.step(admin_login)
+    results += repeat(session, "edit_capa", edit_capa, args.repeat, args.memory)
+    results += time_exports(url, args.memory)
+    return results
+
+
+def run(args):
+    commit = git_commit()
+    stamp = datetime.now().isoformat(timespec="seconds")
+    with open(args.out, "a", encoding="utf-8") as out:
+        for size in args.sizes:
+            for interaction, result in run_size(size, args):
+                row = {"commit": commit, "time": stamp, "orders": size, "interaction": interaction, **result}
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                if result["traced"]:
+                    print(f"{size:>9,} {interaction:<40} {'':>12} {result['peak_mb']:8.1f} MB peak")
+                else:
+                    print(f"{size:>9,} {interaction:<40} {result['wall_s'] * 1000:9.1f} ms")
+
+
+def compare(args):
+    # 커밋별 (규모, 상호작용) 중앙값 비교
+    medians = defaultdict(lambda: defaultdict(list))
+    with open(args.out, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            if row["commit"] in args.compare and not row.get("traced"):
+                medians[(row["orders"], row["interaction"])][row["commit"]].append(row["wall_s"])
+    base, head = args.compare
+    print(f"{'orders':>9} {'interaction':<40} {base:>10} {head:>10} {'change':>8}")
+    for (size, interaction), by_commit in sorted(medians.items()):
+        if base in by_commit and head in by_commit:
+            a, b = statistics.median(by_commit[base]), statistics.median(by_commit[head])
+            print(f"{size:>9,} {interaction:<40} {a * 1000:8.1f}ms {b * 1000:8.1f}ms {(b / a - 1) * 100:+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="opp.py 재실행 성능 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="tracemalloc 메모리 측정 실행 생략")
+    parser.add_argument("--out", default=RESULTS_PATH)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"))
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from profiler import section
+
+# 가동 라인 집계에서 제외되는 오더 상태
+EXCLUDED_STATUSES = {"Cancelled"}
+
+
+def delivery_week(value):
+    if value is None or pd.isna(value):
+        return 0
+    return int(pd.Timestamp(value).isocalendar()[1])
+
+
+class CapaUsageIndex:
+    """(공장, Main/Outsourced, 연도, 납기 주차) 별 사용 라인 합계를 유지하는 인덱스.
+
+    ColumnStore 에 subscribe 해두면 오더 추가 / 수정 시 해당 행의 기여분만 더하고 빼므로
+    조회는 오더 수와 무관하게 dict 조회 한 번이다.
+    """
+
+    def __init__(self):
+        self._weekly = defaultdict(int)
+        self._yearly = defaultdict(int)
+
+    def used(self, factory, prod_type, year, week=None):
+        if week is None:
+            return self._yearly.get((factory, prod_type, str(year)), 0)
+        return self._weekly.get((factory, prod_type, str(year), int(week)), 0)
+
+    def _add(self, key, lines):
+        self._weekly[key] += lines
+        self._yearly[key[:3]] += lines
+
+    def _row_key(self, store, row):
+        if store.value("상태", row) in EXCLUDED_STATUSES:
+            return None
+        factory, prod_type, year = store.value("국가", row), store.value("생산구분", row), store.value("연도", row)
+        if factory is None or prod_type is None or year is None:
+            return None
+        return (factory, prod_type, year, delivery_week(store.value("납기일", row)))
+
+    # --- ColumnStore listener ---
+    def on_rows_added(self, store, rows):
+        if len(rows) == 1:
+            key = self._row_key(store, rows.start)
+            if key is not None:
+                self._add(key, int(store.value("사용라인", rows.start)))
+            return
+        if len(rows) == 0:
+            return
+        with section("usage_scan", rows=len(rows)):
+            sl = slice(rows.start, rows.stop)
+            lines = store.column("사용라인")[sl]
+            df = pd.DataFrame({
+                "국가": store.column("국가")[sl], "생산구분": store.column("생산구분")[sl],
+                "연도": store.column("연도")[sl], "상태": store.column("상태")[sl],
+                "주차": pd.DatetimeIndex(store.column("납기일")[sl]).isocalendar().week.fillna(0).to_numpy(np.int64),
+                "사용라인": lines,
+            })
+            df = df[(df["사용라인"] != 0) & ~df["상태"].isin(EXCLUDED_STATUSES)]
+            grouped = df.groupby(["국가", "생산구분", "연도", "주차"], observed=True)["사용라인"].sum()
+            for (factory, prod_type, year, week), total in grouped.items():
+                self._add((factory, prod_type, year, int(week)), int(total))
+
+    def on_row_discarded(self, store, row):
+        key = self._row_key(store, row)
+        if key is not None:
+            self._add(key, -int(store.value("사용라인", row)))
@@ -0,0 +1,29 @@
+import numpy as np
+
+# 원가 구성 요소 (입력 폼 위젯 키 -> 일괄 등록 파일 컬럼명), 모두 개당 $
+COST_COLUMNS = {
+    "c_yarn": "원사($)", "c_fabric": "원단($)", "c_proc": "원단가공($)", "c_sew": "봉제($)",
+    "c_epw": "EPW($)", "c_trans": "운반비($)", "c_over": "배부비용($)",
+}
+SGA_COLUMN = "판관비($)"
+# 오더 저장 컬럼 (입력 폼 위젯 키 -> ORDER_SCHEMA 컬럼)
+COST_FIELDS = {"c_yarn": "C_Yarn", "c_fabric": "C_Fabric", "c_proc": "C_Proc", "c_sew": "C_Sew",
+               "c_epw": "C_EPW", "c_trans": "C_Trans", "c_over": "C_Over", "c_sga": "C_SGA"}
+# 원가 항목별 지불 통화: USD (달러 조달), local (배정 공장의 현지 통화), 그 외는 통화 코드 (판관비는 본사 KRW)
+COST_CURRENCY = {"C_Yarn": "USD", "C_Fabric": "USD", "C_Proc": "USD", "C_Sew": "local",
+                 "C_EPW": "local", "C_Trans": "local", "C_Over": "local", "C_SGA": "KRW"}
+# 원가 항목이 저장되지 않은 과거 오더는 (매출 - 영업이익) 을 이 비율로 나눠 추정
+DEFAULT_COST_MIX = {"C_Yarn": 0.22, "C_Fabric": 0.25, "C_Proc": 0.10, "C_Sew": 0.20,
+                    "C_EPW": 0.05, "C_Trans": 0.05, "C_Over": 0.05, "C_SGA": 0.08}
+
+
+def calc_profit(qty, unit_price, costs, sga):
+    # 매출 / 제조원가 / 판관비 / 영업이익 / 이익률 (단가, 원가는 개당 $)
+    # 스칼라(입력 폼)와 Series / 배열(일괄 등록) 모두 같은 식으로 계산
+    revenue = qty * unit_price
+    mfg_cost = sum(costs) * qty
+    total_sga = sga * qty
+    profit = revenue - mfg_cost - total_sga
+    rev = np.asarray(revenue, dtype=np.float64)
+    margin = np.divide(np.asarray(profit) * 100, rev, out=np.zeros(rev.shape), where=rev > 0)[()]
+    return revenue, mfg_cost, total_sga, profit, margin
@@ -0,0 +1,134 @@
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import xlsxwriter
+
+from profiler import section
+
+# 형식: (표시 이름, MIME)
+EXPORT_FORMATS = {
+    "xlsx": ("엑셀", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+CHUNK_ROWS = 10_000
+# 엑셀 시트 최대 행 수 (헤더 포함). 넘는 행은 다음 시트로 이어서 쓴다
+XLSX_MAX_ROWS = 1_048_576
+# 생성된 파일 캐시 상한 (전체 바이트). 상한보다 큰 파일은 캐시하지 않는다
+CACHE_BYTES = 256 * 2**20
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def available_formats():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return [f for f in EXPORT_FORMATS if f != "parquet"]
+    return list(EXPORT_FORMATS)
+
+
+def _cell_rows(df, index):
+    # 청크 단위로 object 변환 (NaN / NaT -> 빈 셀). 인덱스는 레벨마다 한 칸
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS]
+        values = chunk.astype(object).where(chunk.notna(), None).to_numpy()
+        labels = [chunk.index.get_level_values(i).to_numpy(dtype=object) for i in range(chunk.index.nlevels)] if index else []
+        for i, row in enumerate(values):
+            yield [level[i] for level in labels] + list(row)
+
+
+def _sheet_name(base, part):
+    # 시트 이름은 31자 제한
+    if part == 1:
+        return base[:31]
+    suffix = f" ({part})"
+    return base[:31 - len(suffix)] + suffix
+
+
+def write_xlsx(df, sheet_name, index=False, max_rows=XLSX_MAX_ROWS):
+    # constant_memory 모드는 행 순서대로만 쓸 수 있으므로 임시 파일에 한 행씩 기록.
+    # 한 시트에 다 들어가지 않으면 "이름 (2)", "이름 (3)" ... 시트에 헤더와 함께 이어서 쓴다
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+        header = ([name or "" for name in df.index.names] if index else []) + [str(c) for c in df.columns]
+        bold = workbook.add_format({"bold": True})
+        sheet, r, part = None, max_rows, 0
+        for row in _cell_rows(df, index):
+            if r >= max_rows:
+                part += 1
+                sheet = workbook.add_worksheet(_sheet_name(sheet_name, part))
+                sheet.write_row(0, 0, header, bold)
+                r = 1
+            sheet.write_row(r, 0, row)
+            r += 1
+        if sheet is None:
+            workbook.add_worksheet(_sheet_name(sheet_name, 1)).write_row(0, 0, header, bold)
+        workbook.close()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def to_bytes(df, fmt, sheet_name="Sheet1", index=False):
+    with section(f"export_{fmt}", rows=len(df)):
+        return _to_bytes(df, fmt, sheet_name, index)
+
+
+def _to_bytes(df, fmt, sheet_name, index):
+    if fmt == "xlsx":
+        return write_xlsx(df, sheet_name, index)
+    if fmt == "csv":
+        return df.to_csv(index=index).encode("utf-8-sig")
+    if fmt == "parquet":
+        out = df.copy()
+        out.columns = [str(c) for c in out.columns]
+        buffer = io.BytesIO()
+        out.to_parquet(buffer, index=index)
+        return buffer.getvalue()
+    raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+
+def exporter(key, build_df, fmt, sheet_name="Sheet1", index=False):
+    """download_button 에 넘길 콜러블. 클릭 시에만 생성하고 (key, fmt) 별로 캐시한다.
+
+    key 에는 데이터 버전을 포함시켜 데이터가 바뀌면 새로 생성되도록 한다.
+    """
+    cache_key = (key, fmt)
+
+    def build():
+        global _cache_bytes
+        with _cache_lock:
+            if cache_key in _cache:
+                _cache.move_to_end(cache_key)
+                return _cache[cache_key]
+        payload = to_bytes(build_df(), fmt, sheet_name, index)
+        if len(payload) > CACHE_BYTES:
+            return payload
+        with _cache_lock:
+            if cache_key not in _cache:
+                _cache[cache_key] = payload
+                _cache_bytes += len(payload)
+            while _cache_bytes > CACHE_BYTES:
+                _, old = _cache.popitem(last=False)
+                _cache_bytes -= len(old)
+        return payload
+
+    return build
+
+
+def download_args(name, key, build_df, fmt, sheet_name="Sheet1", index=False):
+    return {
+        "data": exporter(key, build_df, fmt, sheet_name, index),
+        "file_name": f"{name}.{fmt}",
+        "mime": EXPORT_FORMATS[fmt][1],
+        "on_click": "ignore",
+    }
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from itertools import accumulate
+
+import numpy as np
+import pandas as pd
+
+from profiler import section
+
+# 시뮬레이션 기준 환율 (USD 1 당)
+BASE_RATES = {"KRW": 1430, "VND": 25400, "IDR": 16200, "MMK": 2100, "GTQ": 7.8, "NIO": 36.8, "HTG": 132.5}
+
+
+class SimulatedRateProvider:
+    """오프라인용 대체 제공자. 통화별 고정 시드의 평균회귀 랜덤워크라 같은 날짜는 항상 같은 값을 돌려준다."""
+
+    name = "simulated"
+    label = "Simulation Data"
+    origin = date(2000, 1, 1)
+
+    def fetch(self, currencies, start, end):
+        dates = pd.date_range(start, end, freq="D")
+        first = (start - self.origin).days
+        out = {}
+        for code in currencies:
+            base = BASE_RATES.get(code, 1000)
+            rng = np.random.default_rng(zlib.crc32(code.encode()))
+            shocks = rng.standard_normal(first + len(dates)) * 0.002
+            drift = np.fromiter(accumulate(shocks, lambda prev, e: 0.99 * prev + e), float, len(shocks))[first:]
+            out[code] = base * np.exp(drift)
+        return pd.DataFrame(out, index=dates)
+
+
+class YFinanceRateProvider:
+    name = "yfinance"
+    label = "Yahoo Finance"
+
+    def fetch(self, currencies, start, end):
+        import yfinance as yf
+        tickers = {f"{code}=X": code for code in currencies}
+        raw = yf.download(list(tickers), start=start, end=end + timedelta(days=1),
+                          progress=False, auto_adjust=False, group_by="column")
+        close = raw["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(list(tickers)[0])
+        close = close.rename(columns=tickers)
+        close.index = pd.DatetimeIndex(close.index).tz_localize(None).normalize()
+        return close.dropna(how="all")
+
+
+class RateHistory:
+    # (제공자, 통화, 날짜) 별 환율을 로컬 SQLite 에 보관
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS fx_rates (
+            provider TEXT, currency TEXT, day TEXT, rate REAL, PRIMARY KEY (provider, currency, day))""")
+
+    def coverage(self, provider, currencies):
+        marks = ", ".join("?" * len(currencies))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT currency, MIN(day), MAX(day) FROM fx_rates WHERE provider = ? AND currency IN ({marks}) GROUP BY currency",
+                (provider, *currencies)).fetchall()
+        return {c: (date.fromisoformat(lo), date.fromisoformat(hi)) for c, lo, hi in rows}
+
+    def save(self, provider, frame):
+        rows = [(provider, code, day.strftime("%Y-%m-%d"), float(rate))
+                for code in frame.columns for day, rate in frame[code].dropna().items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO fx_rates VALUES (?, ?, ?, ?)", rows)
+
+    def load(self, provider, currencies, start):
+        marks = ", ".join("?" * len(currencies))
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT currency, day, rate FROM fx_rates WHERE provider = ? AND currency IN ({marks}) AND day >= ?",
+                self._conn, params=(provider, *currencies, start.isoformat()))
+        wide = df.pivot(index="day", columns="currency", values="rate")
+        wide.index = pd.DatetimeIndex(wide.index)
+        return wide.reindex(columns=list(currencies)).sort_index()
+
+
+class ExchangeRateService:
+    """여러 통화를 한 번에 조회하고 결과를 프로세스 전체에서 TTL 동안 재사용한다.
+
+    이력에 없는 기간만 제공자에서 일괄로 받아 저장하므로, 캐시가 만료돼도 다시 받는 것은 최근 며칠분뿐이다.
+    제공자 호출이 실패하면 fallback 제공자로 대신하되, 그 결과는 fallback_ttl 동안만 재사용하고 다시 시도한다.
+    """
+
+    def __init__(self, provider, history, ttl=3600, fallback=None, fallback_ttl=60):
+        self.provider = provider
+        self.history = history
+        self.ttl = ttl
+        self.fallback = fallback
+        self.fallback_ttl = fallback_ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def series(self, currencies, days=30):
+        currencies = tuple(dict.fromkeys(currencies))
+        key = (currencies, days)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and time.monotonic() < hit[0]:
+                return hit[1], hit[2]
+            try:
+                frame, source, ttl = self._load(self.provider, currencies, days), self.provider, self.ttl
+            except Exception:
+                if self.fallback is None:
+                    raise
+                frame, source, ttl = self._load(self.fallback, currencies, days), self.fallback, self.fallback_ttl
+            self._cache[key] = (time.monotonic() + ttl, frame, source.label)
+            return frame, source.label
+
+    def _load(self, provider, currencies, days):
+        today = date.today()
+        start = today - timedelta(days=days - 1)
+        coverage = self.history.coverage(provider.name, currencies)
+        missing_from = []
+        for code in currencies:
+            lo, hi = coverage.get(code, (None, None))
+            if lo is None or lo > start:
+                missing_from.append(start)
+            elif hi < today:
+                missing_from.append(hi + timedelta(days=1))
+        if missing_from:
+            with section(f"fx_fetch_{provider.name}") as stats:
+                fetched = provider.fetch(list(currencies), min(missing_from), today)
+                stats["rows"] = fetched.size
+            # 주말 / 휴일에는 마지막 거래일 이후 새 데이터가 없는 것이 정상
+            if not fetched.empty:
+                self.history.save(provider.name, fetched)
+        frame = self.history.load(provider.name, currencies, start).ffill().dropna(how="all")
+        if frame.empty or frame.iloc[-1].isna().any():
+            raise ValueError("환율 데이터를 받지 못했습니다.")
+        return frame
+
+
+def latest(frame, code):
+    # (현재 환율, 전일 대비 변동)
+    series = frame[code].dropna()
+    if len(series) < 2:
+        return (series.iloc[-1] if len(series) else np.nan), 0.0
+    return series.iloc[-1], series.iloc[-1] - series.iloc[-2]
@@ -1,395 +1,672 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import io
-import random
-
-# --- 1. 페이지 설정 ---
-st.set_page_config(page_title="Global Supply Chain Manager", layout="wide")
-
-# --- 2. 데이터 초기화 ---
-if 'factory_info' not in st.session_state:
-    st.session_state.factory_info = {
-        "베트남(VNM)":      {"Region": "Asia", "Main": 30, "Outsourced": 20, "Currency": "VND"},
-        "인도네시아(IDN)":   {"Region": "Asia", "Main": 25, "Outsourced": 15, "Currency": "IDR"},
-        "미얀마(MMR-내수)":  {"Region": "Asia", "Main": 20, "Outsourced": 10, "Currency": "MMK"},
-        "과테말라(GTM)":     {"Region": "Central America", "Main": 20, "Outsourced": 10, "Currency": "GTQ"},
-        "니카라과(NIC)":     {"Region": "Central America", "Main": 20, "Outsourced": 5, "Currency": "NIO"},
-        "아이티(HTI)":       {"Region": "Central America", "Main": 10, "Outsourced": 5, "Currency": "HTG"}
-    }
-
-# 10년치 과거 오더 데이터
-def generate_mock_history():
-    mock_data = []
-    years = range(2016, 2026) 
-    buyers = ["Target", "Walmart", "Zara", "Gap", "Uniqlo"]
-    fabrics = ["Woven", "Knit", "Synthetic", "Other"]
-    categories = ["Ladies", "Men", "Kids", "Toddler"]
-    destinations = ["USA", "Europe", "Korea", "Japan"]
-    
-    for _ in range(200): 
-        yr = str(random.choice(years))
-        fab = random.choice(fabrics)
-        cat = random.choice(categories)
-        ctry = random.choice(list(st.session_state.factory_info.keys()))
-        dest = random.choice(destinations)
-        qty = random.randint(1000, 50000)
-        price = random.uniform(5.0, 25.0)
-        revenue = qty * price
-        cost_ratio = random.uniform(0.7, 0.9) 
-        profit = revenue * (1 - cost_ratio)
-        
-        mock_data.append({
-            "바이어": random.choice(buyers),
-            "스타일": f"H-{yr}-{random.randint(100,999)}",
-            "연도": yr, "시즌": random.choice(["C1","C2","C3"]), 
-            "복종": fab, "카테고리": cat, "생산국가": ctry.split('(')[0], "수출국가": dest,
-            "수량": qty, "단가": round(price, 2),
-            "매출($)": round(revenue, 2),
-            "영업이익($)": round(profit, 2),
-            "이익률(%)": round((profit/revenue)*100, 1),
-            "국가": ctry, "생산구분": random.choice(["Main", "Outsourced"]),
-            "납기일": f"{yr}-06-15", "상태": "Confirmed",
-            "진행상태": "Store" 
-        })
-    return mock_data
-
-# 10년치 매장 판매 데이터
-def generate_mock_sales():
-    mock_sales = []
-    years = range(2016, 2026)
-    buyers = ["Target", "Walmart", "Zara", "Gap", "Uniqlo"]
-    categories = ["Ladies", "Men", "Kids", "Toddler"]
-    regions = ["North America", "Europe", "Asia Pacific", "Latin America"]
-    
-    for _ in range(300):
-        yr = str(random.choice(years))
-        buy = random.choice(buyers)
-        cat = random.choice(categories)
-        reg = random.choice(regions)
-        sold_qty = random.randint(500, 40000)
-        retail_price = random.uniform(15.0, 60.0) 
-        sales_amt = sold_qty * retail_price
-        mock_sales.append({
-            "연도": yr, "바이어": buy, "카테고리": cat, "판매지역": reg,
-            "판매량(Qty)": sold_qty, "판매금액($)": round(sales_amt, 2),
-            "정상가판매율(%)": round(random.uniform(40, 90), 1)
-        })
-    return mock_sales
-
-if 'orders' not in st.session_state:
-    st.session_state.orders = generate_mock_history()
-if 'sales_data' not in st.session_state:
-    st.session_state.sales_data = generate_mock_sales()
-if 'history_log' not in st.session_state:
-    st.session_state.history_log = []
-
-# --- 3. 사이드바 ---
-with st.sidebar:
-    st.header("⚙️ 관리자 설정")
-    admin_pw = st.text_input("관리자 비밀번호", type="password")
-    
-    if admin_pw == "1452":
-        st.success("인증 성공")
-        tab1, tab2 = st.tabs(["Capa 설정", "수정 이력"])
-        with tab1:
-            st.subheader("라인 수(Capa) 수정")
-            for factory, info in st.session_state.factory_info.items():
-                st.markdown(f"**{factory}**")
-                col_m, col_o = st.columns(2)
-                new_m = col_m.number_input(f"{factory} 본공장", value=info['Main'], key=f"{factory}_m")
-                new_o = col_o.number_input(f"{factory} 외주", value=info['Outsourced'], key=f"{factory}_o")
-                
-                if new_m != info['Main']:
-                    st.session_state.history_log.append({
-                        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "factory": factory, "type": "Main", "old": info['Main'], "new": new_m
-                    })
-                    st.session_state.factory_info[factory]['Main'] = new_m
-                    st.rerun()
-                if new_o != info['Outsourced']:
-                    st.session_state.history_log.append({
-                        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "factory": factory, "type": "Outsourced", "old": info['Outsourced'], "new": new_o
-                    })
-                    st.session_state.factory_info[factory]['Outsourced'] = new_o
-                    st.rerun()
-        with tab2:
-            st.subheader("수정 이력 로그")
-            if st.session_state.history_log:
-                st.dataframe(st.session_state.history_log)
-            else:
-                st.info("수정 이력이 없습니다.")
-
-    st.markdown("---")
-    
-    # 환율 정보
-    st.header("💱 국가별 환율 (USD 기준)")
-    st.caption("※ 최근 30일 추이 (Simulation Data)")
-
-    def get_dummy_exchange_data(currency_code):
-        dates = pd.date_range(end=datetime.now(), periods=30)
-        base_rates = {"KRW": 1430, "VND": 25400, "IDR": 16200, "MMK": 2100, "GTQ": 7.8, "NIO": 36.8, "HTG": 132.5}
-        base = base_rates.get(currency_code, 1000)
-        volatility = base * 0.02 
-        values = base + np.random.randn(30).cumsum() * (volatility * 0.1)
-        return pd.DataFrame({"Rate": values}, index=dates), values[-1], values[-1] - values[-2]
-
-    with st.expander("🇰🇷 대한민국 (KRW)", expanded=True):
-        df_krw, cur_krw, del_krw = get_dummy_exchange_data("KRW")
-        st.metric(label="USD to KRW", value=f"{cur_krw:,.2f}", delta=f"{del_krw:,.2f}")
-        st.line_chart(df_krw, height=100)
-        st.link_button("🔍 Google 환율 (KRW)", "https://www.google.com/search?q=USD+to+KRW", use_container_width=True)
-
-    st.markdown("---")
-
-    for factory, info in st.session_state.factory_info.items():
-        currency = info.get("Currency", "USD")
-        with st.expander(f"{factory} - {currency}", expanded=False):
-            df_rate, current_rate, delta = get_dummy_exchange_data(currency)
-            st.metric(label=f"USD to {currency}", value=f"{current_rate:,.2f}", delta=f"{delta:,.2f}")
-            st.line_chart(df_rate, height=100)
-            url = f"https://www.google.com/search?q=USD+to+{currency}+exchange+rate"
-            st.link_button(f"🔍 Google 환율 ({currency})", url, use_container_width=True)
-
-# --- 4. 메인 타이틀 ---
-st.markdown("<h1 style='text-align: center; font-size: 24px; white-space: nowrap;'>글로벌 공급망 관리 시스템</h1>", unsafe_allow_html=True)
-st.markdown("---")
-
-# --- 5. 대시보드 ---
-st.subheader("🏭 국가별 공장 가동 현황")
-usage_data = {f: {"Main": 0, "Outsourced": 0} for f in st.session_state.factory_info}
-for item in st.session_state.orders:
-    if item["국가"] in usage_data and str(item.get('연도')) == str(datetime.now().year):
-        usage_data[item["국가"]][item["생산구분"]] += int(item.get("사용라인", 0))
-
-cols = st.columns(3)
-for idx, (factory, info) in enumerate(st.session_state.factory_info.items()):
-    with cols[idx % 3]:
-        with st.container(border=True):
-            st.markdown(f"**{factory}**")
-            m_used = usage_data[factory]["Main"]
-            m_total = info['Main']
-            st.markdown(f"본공장: {':red[' if m_used>=m_total else ''}{m_used} / {m_total}{']' if m_used>=m_total else ''}")
-            o_used = usage_data[factory]["Outsourced"]
-            o_total = info['Outsourced']
-            st.markdown(f"외주공장: {':red[' if o_used>=o_total else ''}{o_used} / {o_total}{']' if o_used>=o_total else ''}")
-
-# --- 5-1. CCTV ---
-st.markdown("---")
-st.subheader("🎥 실시간 공장 CCTV 모니터링 (Live Feed)")
-cctv_cols = st.columns(3)
-dummy_video_url = "https://www.youtube.com/watch?v=Fj0X7c3_9n4" 
-for idx, factory in enumerate(st.session_state.factory_info.keys()):
-    with cctv_cols[idx % 3]:
-        with st.container(border=True):
-            st.markdown(f"**{factory}** &nbsp; :red[● REC]", unsafe_allow_html=True)
-            st.video(dummy_video_url)
-            st.caption(f"📍 Location: {factory} Main Line")
-
-st.markdown("---")
-
-# --- 6. 생산 오더 입력 ---
-st.subheader("📝 생산 오더 입력")
-col_buyer, col_link1, col_link2, col_link3, col_link4 = st.columns([2, 1, 1, 1, 1], vertical_alignment="bottom")
-with col_buyer: buyer = st.text_input("바이어 (Buyer)", placeholder="기업명을 입력하세요")
-with col_link1: 
-    if buyer: st.link_button("신용도(구글)", f"https://www.google.com/search?q={buyer}+기업+실적+신용도", use_container_width=True)
-    else: st.button("신용도(구글)", disabled=True, use_container_width=True)
-with col_link2: 
-    if buyer: st.link_button("신용도(Gemini)", "https://gemini.google.com/app", use_container_width=True)
-    else: st.button("신용도(Gemini)", disabled=True, use_container_width=True)
-with col_link3: st.link_button("Oritain(TBD)", "https://oritain.com", use_container_width=True)
-with col_link4: st.link_button("Altana 플랫폼", "https://www.altana.ai", use_container_width=True)
-if buyer: st.caption(f"Tip: Gemini 버튼 클릭 후 **'{buyer} 실적과 신용도 알려줘'** 라고 질문하세요.")
-
-st.markdown("##### 👕 스타일 기준 정보 입력")
-s1, s2, s3, s4, s5, s6, s7 = st.columns(7)
-s_name = s1.text_input("1.오더명", placeholder="ex) O-123")
-s_year = s2.selectbox("2.연도", [str(y) for y in range(2025, 2031)])
-s_season = s3.selectbox("3.시즌", ["C1", "C2", "C3", "C4"])
-s_fabric = s4.selectbox("4.복종", ["Woven", "Knit", "Synthetic", "Other"])
-s_cat = s5.selectbox("5.카테고리", ["Ladies", "Men", "Adult", "Kids", "Girls", "Boys", "Toddler"])
-s_prod = s6.selectbox("6.생산국가", ["VNM", "IDN", "MMR", "GTM", "NIC", "HTI", "ETC"])
-s_dest = s7.selectbox("7.수출국가", ["USA", "Europe", "Japan", "Korea", "Other"])
-
-st.markdown("---")
-c1, c2, c3, c4 = st.columns(4)
-qty = c1.number_input("수량 (Q'ty)", min_value=0, step=100)
-unit_price = c2.number_input("단가 ($ Unit Price)", min_value=0.0, step=0.1, format="%.2f")
-del_date = c3.date_input("납기일", datetime.now())
-country = c4.selectbox("🏭 배정 공장", list(st.session_state.factory_info.keys()))
-c5, c6, c7 = st.columns([1, 2, 1])
-prod_type = c5.selectbox("생산 구분", ["Main", "Outsourced"])
-detail_name = c6.text_input("상세 공장명", placeholder="공장/라인 이름 입력")
-lines = c7.number_input("필요 라인", min_value=1, value=1)
-
-st.markdown("---")
-st.markdown("##### 💰 예상 원가 및 수행 업체 등록 (Cost & Vendors)")
-rc1, rc2, rc3, rc4 = st.columns([1, 1.5, 1, 1.5])
-with rc1: c_yarn = st.number_input("1.원사 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc2: v_yarn = st.text_input("원사 업체명", placeholder="Yarn Supplier")
-with rc3: c_fabric = st.number_input("2.원단 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc4: v_fabric = st.text_input("원단 업체명", placeholder="Fabric Mill")
-rc5, rc6, rc7, rc8 = st.columns([1, 1.5, 1, 1.5])
-with rc5: c_proc = st.number_input("3.원단가공 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc6: v_proc = st.text_input("가공 업체명", placeholder="Dyeing/Finishing")
-with rc7: c_sew = st.number_input("4.봉제 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc8: v_sew = st.text_input("봉제 공장명", placeholder="Sewing Factory", value=detail_name if detail_name else "") 
-rc9, rc10, rc11, rc12 = st.columns([1, 1.5, 1, 1.5])
-with rc9: c_epw = st.number_input("5.EPW ($)", min_value=0.0, format="%.2f", step=0.1, help="Embroidery, Printing, Washing")
-with rc10: v_epw = st.text_input("EPW 업체명", placeholder="Emb/Print/Wash")
-with rc11: c_trans = st.number_input("6.운반비 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc12: v_trans = st.text_input("운송 업체명", placeholder="Logistics")
-rc13, rc14, rc15, rc16 = st.columns([1, 1.5, 1, 1.5])
-with rc13: c_over = st.number_input("7.배부비용 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc14: st.markdown("*(Internal Cost)*")
-with rc15: c_sga = st.number_input("➕ 추가 판관비 ($)", min_value=0.0, format="%.2f", step=0.1)
-with rc16: st.markdown("*(SG&A)*")
-
-est_revenue = qty * unit_price
-total_mfg_cost_unit = c_yarn + c_fabric + c_proc + c_sew + c_epw + c_trans + c_over
-total_mfg_cost = total_mfg_cost_unit * qty
-total_sga = c_sga * qty
-op_profit = est_revenue - total_mfg_cost - total_sga
-op_margin = (op_profit / est_revenue * 100) if est_revenue > 0 else 0
-
-st.markdown("---")
-st.subheader("🚀 오더 진행 현황 (Progress Tracking)")
-progress_steps = ["Planning", "Yarn", "Fabric", "Processing", "Sewing", "EPW", "Inspection", "Ex-Factory", "Shipping Port", "Shipped", "Destination Port", "In-land Trucking", "Warehouse", "Store (Remained Days)"]
-current_stage = st.selectbox("현재 진행 공정을 선택하세요:", progress_steps, index=0)
-logistics_info_col1, logistics_info_col2 = st.columns([3, 1])
-tracking_url = ""
-if current_stage in ["Ex-Factory", "Shipping Port", "Shipped", "Destination Port", "In-land Trucking", "Warehouse"]:
-    with logistics_info_col1: track_no = st.text_input("🚢 운송장 번호 / 선박명 / B/L No", placeholder="Tracking Info")
-    with logistics_info_col2:
-        st.write("")
-        st.write("") 
-        if current_stage == "Shipped":
-            st.link_button("🚢 선박 위치 추적 (MarineTraffic)", f"https://www.marinetraffic.com/en/ais/home/search:{track_no if track_no else ''}", use_container_width=True)
-        elif current_stage in ["Shipping Port", "Destination Port"]:
-            st.link_button("⚓ 항만 스케줄 조회", f"https://www.google.com/search?q={track_no}+port+schedule", use_container_width=True)
-        elif current_stage == "In-land Trucking":
-            st.link_button("🚛 화물 위치 추적", f"https://www.google.com/search?q={track_no}+tracking", use_container_width=True)
-        elif current_stage in ["Ex-Factory", "Warehouse"]:
-            st.button("🏭 입출고 현황 조회 (WMS)", disabled=True, use_container_width=True)
-
-current_idx = progress_steps.index(current_stage)
-progress_value = (current_idx + 1) / len(progress_steps)
-st.progress(progress_value)
-step_html = ""
-for i, step in enumerate(progress_steps):
-    color = "blue" if i <= current_idx else "gray"
-    weight = "bold" if i == current_idx else "normal"
-    marker = "🔵" if i <= current_idx else "⚪"
-    step_html += f"<span style='color:{color}; font-weight:{weight}; font-size:14px'>{marker} {step}</span>"
-    if i < len(progress_steps) - 1: step_html += " &rarr; "
-st.markdown(step_html, unsafe_allow_html=True)
-if current_stage == "Store (Remained Days)":
-    st.write("")
-    remained_days = st.number_input("매장 도착까지 남은 일수 (D-Day)", min_value=0, value=7)
-    st.info(f"🚚 매장 입고까지 약 **{remained_days}일** 남았습니다.")
-
-st.markdown("---")
-st.subheader("🌿 지속가능경영 (Sustainability)")
-sus1, sus2, sus3 = st.columns(3)
-with sus1: sus_power = st.number_input("전력 (kw)", min_value=0.0, step=100.0)
-with sus2: sus_water = st.number_input("물 절감 (리터)", min_value=0.0, step=100.0)
-with sus3: sus_carbon = st.number_input("기타 자원/탄소절감 (kg)", min_value=0.0, step=50.0)
-st.caption("*전력, 물 및 기타 자원 절감량을 탄소절감량으로 환산 가능함")
-
-st.markdown("---")
-st.subheader("📊 영업 수익성 분석")
-col_est, col_act = st.columns(2)
-with col_est:
-    st.info("**[예상 영업수익성] (Pre-shipment)**")
-    st.write(f"매출: ${est_revenue:,.2f} / 원가: ${total_mfg_cost:,.2f}")
-    st.write(f"**영업이익: ${op_profit:,.2f} ({op_margin:.1f}%)**")
-with col_act:
-    st.success("**[확정 영업수익성] (Post-shipment)**")
-    st.write(f"매출: ${est_revenue:,.2f} / 원가: ${total_mfg_cost:,.2f}")
-    st.write(f"**영업이익: ${op_profit:,.2f} ({op_margin:.1f}%)**")
-
-st.write("") 
-btn_col1, btn_col2 = st.columns([1, 1])
-current_u = usage_data[country][prod_type]
-limit = st.session_state.factory_info[country][prod_type]
-is_capa_full = (current_u + lines > limit)
-
-def save_order(status):
-    full_style_code = f"{s_name}_{s_year}_{s_season}_{s_fabric}_{s_cat}_{s_prod}_{s_dest}"
-    new_order = {
-        "바이어": buyer, "스타일": full_style_code, "오더명": s_name, "연도": s_year, "시즌": s_season, 
-        "복종": s_fabric, "카테고리": s_cat, "생산국가": s_prod, "수출국가": s_dest, "수량": qty, "단가": unit_price,
-        "납기일": str(del_date), "국가": country, "생산구분": prod_type, "상세공장명": detail_name, "사용라인": lines,
-        "상태": status, "진행상태": current_stage, "매출($)": round(est_revenue, 2), "영업이익($)": round(op_profit, 2),
-        "이익률(%)": round(op_margin, 1), "V_Yarn": v_yarn, "V_Fabric": v_fabric, "V_Proc": v_proc, 
-        "V_Sew": v_sew, "V_EPW": v_epw, "V_Trans": v_trans, "ESG_Power": sus_power, "ESG_Water": sus_water, "ESG_Carbon": sus_carbon
-    }
-    st.session_state.orders.append(new_order)
-
-if btn_col1.button("📝 오더 등록 (Estimated Order)", use_container_width=True):
-    if not buyer or not s_name or qty == 0: st.error("필수 정보를 입력해주세요.")
-    else:
-        if is_capa_full: st.warning("Capa 초과 상태입니다.")
-        save_order("Estimated")
-        st.success("예상 오더 등록 완료!")
-        st.rerun()
-if btn_col2.button("✅ 오더 확정 (Confirm Order)", type="primary", use_container_width=True):
-    if not buyer or not s_name or qty == 0: st.error("필수 정보를 입력해주세요.")
-    else:
-        save_order("Confirmed")
-        st.balloons()
-        st.success("오더 확정 완료!")
-        st.rerun()
-
-st.markdown("---")
-c_list, c_down = st.columns([4, 1])
-c_list.subheader("📋 오더 리스트")
-if st.session_state.orders:
-    df = pd.DataFrame(st.session_state.orders)
-    cols_order = ["상태", "진행상태", "연도", "바이어", "스타일", "수량", "매출($)", "영업이익($)", "ESG_Carbon", "국가", "납기일"]
-    display_cols = [c for c in cols_order if c in df.columns]
-    st.dataframe(df[display_cols], use_container_width=True)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer: df.to_excel(writer, index=False, sheet_name='Sheet1')
-    c_down.download_button("📥 리스트 엑셀 저장", output.getvalue(), "order_list.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-else: st.info("등록된 오더가 없습니다.")
-
-st.markdown("---")
-st.subheader("📈 오더 분석(최대 10년)")
-if st.session_state.orders:
-    df_anal = pd.DataFrame(st.session_state.orders)
-    anal_col1, anal_col2, anal_col3 = st.columns([1, 1, 2])
-    criteria = anal_col1.selectbox("📊 분석 기준 선택 (오더)", ["바이어", "복종", "카테고리", "생산국가", "수출국가", "시즌"])
-    metric = anal_col2.selectbox("📈 시각화 지표 (오더)", ["매출($)", "영업이익($)", "수량"])
-    try:
-        pivot_df = df_anal.pivot_table(index="연도", columns=criteria, values=metric, aggfunc="sum", fill_value=0)
-        st.line_chart(pivot_df)
-        st.markdown("##### 📄 분석 데이터 상세 (Table)")
-        st.dataframe(pivot_df.style.format("{:,.0f}"), use_container_width=True)
-        output_anal = io.BytesIO()
-        with pd.ExcelWriter(output_anal, engine='xlsxwriter') as writer: pivot_df.to_excel(writer, sheet_name='Analytics')
-        anal_col3.download_button(f"📥 '{criteria}'별 오더 분석 데이터 엑셀 저장", output_anal.getvalue(), f"order_analysis_{criteria}.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True)
-    except Exception as e: st.error(f"데이터 분석 중 오류가 발생했습니다: {e}")
-else: st.info("분석할 데이터가 없습니다.")
-
-st.markdown("---")
-st.subheader("🛒 해당 스타일 매장 판매 현황(최대 10년)")
-if st.session_state.sales_data:
-    df_sales = pd.DataFrame(st.session_state.sales_data)
-    sale_col1, sale_col2, sale_col3 = st.columns([1, 1, 2])
-    s_criteria = sale_col1.selectbox("📊 분석 기준 선택 (판매)", ["바이어", "카테고리", "판매지역"])
-    s_metric = sale_col2.selectbox("📈 시각화 지표 (판매)", ["판매금액($)", "판매량(Qty)", "정상가판매율(%)"])
-    try:
-        if s_metric == "정상가판매율(%)": pivot_sales = df_sales.pivot_table(index="연도", columns=s_criteria, values=s_metric, aggfunc="mean", fill_value=0)
-        else: pivot_sales = df_sales.pivot_table(index="연도", columns=s_criteria, values=s_metric, aggfunc="sum", fill_value=0)
-        st.line_chart(pivot_sales)
-        st.markdown("##### 📄 매장 판매 데이터 상세 (Table)")
-        st.dataframe(pivot_sales.style.format("{:,.1f}" if s_metric=="정상가판매율(%)" else "{:,.0f}"), use_container_width=True)
-        output_sales = io.BytesIO()
-        with pd.ExcelWriter(output_sales, engine='xlsxwriter') as writer: pivot_sales.to_excel(writer, sheet_name='Sales_Analytics')
-        sale_col3.download_button(f"📥 '{s_criteria}'별 판매 현황 데이터 엑셀 저장", output_sales.getvalue(), f"sales_analysis_{s_criteria}.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True)
-    except Exception as e: st.error(f"판매 데이터 분석 중 오류가 발생했습니다: {e}")
-else: st.info("판매 데이터가 없습니다.")
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+import os
+from storage import SharedData
+from synthetic import DEFAULT_FACTORY_INFO, generate_orders, generate_sales
+from exports import EXPORT_FORMATS, available_formats, download_args
+from fx import ExchangeRateService, RateHistory, SimulatedRateProvider, YFinanceRateProvider, latest
+from profiler import RECORDER, memory_tracing, section, set_memory_tracing, timed
+from search import find_rows
+from costing import COST_COLUMNS, COST_FIELDS, calc_profit
+import order_import
+import scenario
+from scheduler import PCS_PER_LINE_WEEK, plan_start
+from analytics import SELL_THROUGH_KEYS
+
+# --- 1. 페이지 설정 ---
+st.set_page_config(page_title="Global Supply Chain Manager", layout="wide")
+
+# --- 2. 데이터 초기화 ---
+# 저장소 위치 (기본: opp.py 옆 SQLite 파일, OPP_STORAGE 로 sqlite:/// 또는 parquet:/// 지정)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STORAGE_URL = os.environ.get("OPP_STORAGE", "sqlite:///" + os.path.join(APP_DIR, "opp_data.sqlite3"))
+# 환율 이력 파일 / 제공자 (OPP_FX_PROVIDER=simulated 이면 오프라인 시뮬레이션)
+FX_HISTORY_PATH = os.environ.get("OPP_FX_HISTORY", os.path.join(APP_DIR, "fx_history.sqlite3"))
+FX_PROVIDER = os.environ.get("OPP_FX_PROVIDER", "yfinance")
+# 빈 저장소에 채울 10년치 과거 오더 / 매장 판매 데이터 규모 (부하 테스트 시 늘려서 사용)
+MOCK_ORDERS = int(os.environ.get("OPP_MOCK_ORDERS", 200))
+MOCK_SALES = int(os.environ.get("OPP_MOCK_SALES", 300))
+MOCK_SEED = int(os.environ.get("OPP_MOCK_SEED", 0))
+
+# 모든 세션이 공유하는 데이터 (저장소가 비어 있으면 과거 데이터로 초기 적재)
+@st.cache_resource
+def get_shared_data():
+    return SharedData.open(STORAGE_URL, seed=lambda: (
+        DEFAULT_FACTORY_INFO, generate_orders(MOCK_ORDERS, MOCK_SEED, factories=DEFAULT_FACTORY_INFO),
+        generate_sales(MOCK_SALES, MOCK_SEED)))
+
+with section("data_load"):
+    data = get_shared_data()
+
+@st.cache_resource
+def get_fx_service():
+    simulated = SimulatedRateProvider()
+    provider = simulated if FX_PROVIDER == "simulated" else YFinanceRateProvider()
+    return ExchangeRateService(provider, RateHistory(FX_HISTORY_PATH), fallback=simulated)
+
+# --- 섹션(fragment) 별 데이터 의존성 ---
+# 각 섹션은 st.fragment 로 독립 재실행되고, 데이터를 바꾼 섹션은 data_changed() 로
+# 같은 데이터에 의존하는 다른 섹션이 있을 때만 전체 화면을 다시 그린다.
+SECTION_DEPS = {
+    "admin": {"factory_info", "history_log"},
+    "fx": {"factory_info"},
+    "dashboard": {"factory_info", "orders"},
+    "schedule": {"factory_info", "orders"},
+    "cctv": {"factory_info"},
+    "order_entry": {"factory_info", "orders"},
+    "order_import": {"factory_info", "orders"},
+    "progress": set(),
+    "profitability": set(),
+    "order_list": {"orders"},
+    "order_analytics": {"orders"},
+    "scenario": {"factory_info", "orders"},
+    "sales_analytics": {"sales"},
+    "sell_through": {"orders", "sales"},
+}
+
+def data_changed(section, *changed):
+    others = [name for name, deps in SECTION_DEPS.items() if name != section and deps & set(changed)]
+    st.rerun(scope="app" if others else "fragment")
+
+COST_KEYS = list(COST_COLUMNS)
+
+def form_profit():
+    ss = st.session_state
+    return calc_profit(ss.get("qty", 0), ss.get("unit_price", 0.0), [ss.get(k, 0.0) for k in COST_KEYS], ss.get("c_sga", 0.0))
+
+def export_controls(fmt_col, btn_col, fmt_key, label, name, key, build, sheet="Sheet1", index=False, **button_args):
+    # 저장 형식 선택 + 다운로드 버튼 (파일은 클릭 시 생성, 적재된 데이터 + key 별 캐시)
+    fmt = fmt_col.selectbox("저장 형식", available_formats(), format_func=lambda f: EXPORT_FORMATS[f][0], key=fmt_key, label_visibility="collapsed")
+    btn_col.download_button(f"📥 {label} {EXPORT_FORMATS[fmt][0]} 저장", **button_args,
+                            **download_args(name, (data.uid, *key), build, fmt, sheet, index))
+
+# --- 3. 사이드바 ---
+CAPA_FIELDS = {"Main": ("m", "본공장"), "Outsourced": ("o", "외주")}
+
+def apply_capa(factory, prod_type, key):
+    # 위젯을 직접 바꾼 세션만 저장 (다른 세션의 오래된 위젯 값이 덮어쓰지 않도록)
+    value = st.session_state[key]
+    if value != data.factory_info[factory][prod_type]:
+        data.set_capa(factory, prod_type, value)
+        st.session_state["capa_changed"] = True
+
+@st.fragment
+@timed("admin")
+def admin_panel():
+    st.header("⚙️ 관리자 설정")
+    admin_pw = st.text_input("관리자 비밀번호", type="password")
+    
+    if admin_pw == "1452":
+        st.success("인증 성공")
+        tab1, tab2, tab3 = st.tabs(["Capa 설정", "수정 이력", "성능 프로파일"])
+        with tab1:
+            st.subheader("라인 수(Capa) 수정")
+            for factory, info in data.factory_info.items():
+                st.markdown(f"**{factory}**")
+                for col, (prod_type, (suffix, label)) in zip(st.columns(2), CAPA_FIELDS.items()):
+                    key = f"{factory}_{suffix}"
+                    # 위젯 값은 공유 Capa 를 따라감 (다른 세션이 바꾼 값 포함)
+                    if st.session_state.get(key) != info[prod_type]:
+                        st.session_state[key] = info[prod_type]
+                    col.number_input(f"{factory} {label}", min_value=0, step=1, key=key,
+                                     on_change=apply_capa, args=(factory, prod_type, key))
+            if st.session_state.pop("capa_changed", False):
+                data_changed("admin", "factory_info", "history_log")
+        with tab2:
+            st.subheader("수정 이력 로그")
+            if data.history_log:
+                st.dataframe(data.history_log)
+            else:
+                st.info("수정 이력이 없습니다.")
+        with tab3:
+            profiler_panel()
+
+def profiler_panel():
+    # 모든 세션 / 재실행에 걸친 섹션별 샘플 (최근 샘플 기준 이동 백분위수)
+    st.subheader("섹션별 실행 시간")
+    # 추적 여부는 프로세스 전체 설정이므로 위젯은 현재 상태를 보여주고, 바꿀 때만 적용
+    st.session_state["prof_mem"] = memory_tracing()
+    st.toggle("최대 메모리 측정 (tracemalloc, 전체 세션)", key="prof_mem", help="켜져 있는 동안 모든 세션의 실행이 느려집니다.",
+              on_change=lambda: set_memory_tracing(st.session_state["prof_mem"]))
+    summary = RECORDER.summary()
+    if summary.empty:
+        st.info("수집된 샘플이 없습니다.")
+        return
+    st.caption(f"최근 샘플 {int(summary['호출 수'].sum()):,}개 기준")
+    st.dataframe(summary.style.format("{:,.1f}", na_rep="-").format("{:,.0f}", subset=["호출 수"]))
+    st.bar_chart(summary[["p50 (ms)", "p90 (ms)"]], horizontal=True)
+    c_fmt, c_down, c_clear = st.columns([1, 2, 1], vertical_alignment="bottom")
+    export_controls(c_fmt, c_down, "fmt_prof", "원본 샘플", "profiler_samples", ("profiler_samples", RECORDER.mark()), RECORDER.frame,
+                    "Samples", use_container_width=True)
+    c_clear.button("초기화", on_click=RECORDER.clear, use_container_width=True)
+
+@st.fragment
+@timed("fx")
+@st.cache_resource(max_entries=64)
+def fx_chart_spec(days, rates):
+    # st.line_chart 는 재실행마다 altair 스펙을 새로 만들어 느리므로 (통화, 환율 값) 별로 vega-lite 스펙을 재사용
+    return {
+        "data": {"values": [{"day": d, "Rate": r} for d, r in zip(days, rates)]},
+        "mark": {"type": "line"},
+        "encoding": {"x": {"field": "day", "type": "temporal", "title": None},
+                     "y": {"field": "Rate", "type": "quantitative", "title": None, "scale": {"zero": False}}},
+    }
+
+def fx_chart(fx_rates, currency):
+    series = fx_rates[currency].dropna()
+    spec = fx_chart_spec(tuple(series.index.strftime("%Y-%m-%d")), tuple(series.round(6).tolist()))
+    st.vega_lite_chart(spec, height=100, use_container_width=True)
+
+def fx_panel():
+    # 환율 정보
+    st.header("💱 국가별 환율 (USD 기준)")
+    # 전체 통화를 한 번에 조회 (프로세스 공용 TTL 캐시 + 로컬 이력)
+    fx_rates, fx_source = get_fx_service().series(["KRW"] + [info.get("Currency", "USD") for info in data.factory_info.values()], days=30)
+    st.caption(f"※ 최근 30일 추이 ({fx_source})")
+
+    with st.expander("🇰🇷 대한민국 (KRW)", expanded=True):
+        cur_krw, del_krw = latest(fx_rates, "KRW")
+        st.metric(label="USD to KRW", value=f"{cur_krw:,.2f}", delta=f"{del_krw:,.2f}")
+        fx_chart(fx_rates, "KRW")
+        st.link_button("🔍 Google 환율 (KRW)", "https://www.google.com/search?q=USD+to+KRW", use_container_width=True)
+
+    st.markdown("---")
+
+    for factory, info in data.factory_info.items():
+        currency = info.get("Currency", "USD")
+        with st.expander(f"{factory} - {currency}", expanded=False):
+            current_rate, delta = latest(fx_rates, currency)
+            st.metric(label=f"USD to {currency}", value=f"{current_rate:,.2f}", delta=f"{delta:,.2f}")
+            fx_chart(fx_rates, currency)
+            url = f"https://www.google.com/search?q=USD+to+{currency}+exchange+rate"
+            st.link_button(f"🔍 Google 환율 ({currency})", url, use_container_width=True)
+
+with st.sidebar:
+    admin_panel()
+    st.markdown("---")
+    fx_panel()
+
+# --- 4. 메인 타이틀 ---
+st.markdown("<h1 style='text-align: center; font-size: 24px; white-space: nowrap;'>글로벌 공급망 관리 시스템</h1>", unsafe_allow_html=True)
+st.markdown("---")
+
+# --- 5. 대시보드 ---
+@st.fragment
+@timed("dashboard")
+def capacity_dashboard():
+    st.subheader("🏭 국가별 공장 가동 현황")
+    usage_index = data.usage_index
+    this_year = datetime.now().year
+
+    cols = st.columns(3)
+    for idx, (factory, info) in enumerate(data.factory_info.items()):
+        with cols[idx % 3]:
+            with st.container(border=True):
+                st.markdown(f"**{factory}**")
+                m_used = usage_index.used(factory, "Main", this_year)
+                m_total = info['Main']
+                st.markdown(f"본공장: {':red[' if m_used>=m_total else ''}{m_used} / {m_total}{']' if m_used>=m_total else ''}")
+                o_used = usage_index.used(factory, "Outsourced", this_year)
+                o_total = info['Outsourced']
+                st.markdown(f"외주공장: {':red[' if o_used>=o_total else ''}{o_used} / {o_total}{']' if o_used>=o_total else ''}")
+
+capacity_dashboard()
+
+# --- 5-0. 주간 라인 배정 계획 ---
+SCHEDULE_TABLE_ROWS = 500
+
+@st.fragment
+@timed("schedule")
+def line_schedule_panel():
+    with st.expander("🗓️ 주간 라인 배정 계획 (납기 기준)"):
+        c_start, c_factory = st.columns([1, 2])
+        start = c_start.date_input("계획 시작일", datetime.now(), key="plan_start")
+        schedule, load, replanned = data.scheduler.plan(data.factory_info, start)
+        if schedule.empty:
+            st.info("계획 시작일 이후 납기인 오더가 없습니다.")
+            return
+        counts = schedule["상태"].value_counts()
+        m = st.columns(5)
+        m[0].metric("미완료 오더", f"{len(schedule):,}")
+        for col, label in zip(m[1:], ["정상", "구분 전환", "공장 이동", "미배정"]):
+            col.metric(label, f"{counts.get(label, 0):,}")
+        st.caption(f"납기 주부터 거꾸로 라인을 채우고, 부족하면 같은 공장 다른 구분 → 같은 Region 다른 공장 순으로 넘깁니다. "
+                   f"라인 1개 = 주당 {PCS_PER_LINE_WEEK:,}장 · 이번 재계산 {replanned:,}건")
+
+        factory = c_factory.selectbox("공장별 주간 사용 라인", list(data.factory_info), key="plan_factory")
+        info = data.factory_info[factory]
+        weekly = load[factory].rename(columns={t: f"{t} (Capa {info[t]})" for t in load[factory].columns})
+        st.bar_chart(weekly, stack=False)
+
+        moved = schedule[schedule["상태"] != "정상"]
+        st.markdown(f"##### 🔀 전환 / 미배정 오더 ({len(moved):,}건)")
+        shown = moved.head(SCHEDULE_TABLE_ROWS)
+        details = data.orders.take(shown["No."].to_numpy(), ["바이어", "스타일", "수량", "사용라인", "납기일"]).reset_index(drop=True)
+        table = pd.concat([shown.reset_index(drop=True), details], axis=1)
+        for col in ["시작 주", "납기 주"]:
+            table[col] = pd.to_datetime(plan_start(start)) + pd.to_timedelta(table[col].where(table[col] >= 0) * 7, unit="D")
+        st.dataframe(table, hide_index=True, use_container_width=True,
+                     column_config={c: st.column_config.DateColumn(c) for c in ["시작 주", "납기 주", "납기일"]})
+        sch_fmt, sch_down = st.columns([0.5, 1.5], vertical_alignment="bottom")
+        sch_key = ("schedule", data.orders.version, str(start), tuple((f, i["Main"], i["Outsourced"]) for f, i in data.factory_info.items()))
+        export_controls(sch_fmt, sch_down, "fmt_schedule", "전체 배정 계획", "line_schedule", sch_key, lambda: schedule, "Schedule",
+                        use_container_width=True)
+
+line_schedule_panel()
+
+# --- 5-1. CCTV ---
+@st.fragment
+@timed("cctv")
+def cctv_wall():
+    st.subheader("🎥 실시간 공장 CCTV 모니터링 (Live Feed)")
+    cctv_cols = st.columns(3)
+    dummy_video_url = "https://www.youtube.com/watch?v=Fj0X7c3_9n4" 
+    for idx, factory in enumerate(data.factory_info.keys()):
+        with cctv_cols[idx % 3]:
+            with st.container(border=True):
+                st.markdown(f"**{factory}** &nbsp; :red[● REC]", unsafe_allow_html=True)
+                st.video(dummy_video_url)
+                st.caption(f"📍 Location: {factory} Main Line")
+
+st.markdown("---")
+cctv_wall()
+st.markdown("---")
+
+# --- 6. 생산 오더 입력 ---
+@st.fragment
+@timed("progress")
+def progress_tracking():
+    st.subheader("🚀 오더 진행 현황 (Progress Tracking)")
+    progress_steps = ["Planning", "Yarn", "Fabric", "Processing", "Sewing", "EPW", "Inspection", "Ex-Factory", "Shipping Port", "Shipped", "Destination Port", "In-land Trucking", "Warehouse", "Store (Remained Days)"]
+    current_stage = st.selectbox("현재 진행 공정을 선택하세요:", progress_steps, index=0, key="current_stage")
+    logistics_info_col1, logistics_info_col2 = st.columns([3, 1])
+    if current_stage in ["Ex-Factory", "Shipping Port", "Shipped", "Destination Port", "In-land Trucking", "Warehouse"]:
+        with logistics_info_col1: track_no = st.text_input("🚢 운송장 번호 / 선박명 / B/L No", placeholder="Tracking Info")
+        with logistics_info_col2:
+            st.write("")
+            st.write("") 
+            if current_stage == "Shipped":
+                st.link_button("🚢 선박 위치 추적 (MarineTraffic)", f"https://www.marinetraffic.com/en/ais/home/search:{track_no if track_no else ''}", use_container_width=True)
+            elif current_stage in ["Shipping Port", "Destination Port"]:
+                st.link_button("⚓ 항만 스케줄 조회", f"https://www.google.com/search?q={track_no}+port+schedule", use_container_width=True)
+            elif current_stage == "In-land Trucking":
+                st.link_button("🚛 화물 위치 추적", f"https://www.google.com/search?q={track_no}+tracking", use_container_width=True)
+            elif current_stage in ["Ex-Factory", "Warehouse"]:
+                st.button("🏭 입출고 현황 조회 (WMS)", disabled=True, use_container_width=True)
+
+    current_idx = progress_steps.index(current_stage)
+    progress_value = (current_idx + 1) / len(progress_steps)
+    st.progress(progress_value)
+    step_html = ""
+    for i, step in enumerate(progress_steps):
+        color = "blue" if i <= current_idx else "gray"
+        weight = "bold" if i == current_idx else "normal"
+        marker = "🔵" if i <= current_idx else "⚪"
+        step_html += f"<span style='color:{color}; font-weight:{weight}; font-size:14px'>{marker} {step}</span>"
+        if i < len(progress_steps) - 1: step_html += " &rarr; "
+    st.markdown(step_html, unsafe_allow_html=True)
+    if current_stage == "Store (Remained Days)":
+        st.write("")
+        remained_days = st.number_input("매장 도착까지 남은 일수 (D-Day)", min_value=0, value=7)
+        st.info(f"🚚 매장 입고까지 약 **{remained_days}일** 남았습니다.")
+
+# 원가 입력과 수익성 분석은 함께 재실행 (원가 입력 시 나머지 화면은 그대로)
+@st.fragment
+@timed("profitability")
+def cost_and_profitability():
+    st.markdown("##### 💰 예상 원가 및 수행 업체 등록 (Cost & Vendors)")
+    rc1, rc2, rc3, rc4 = st.columns([1, 1.5, 1, 1.5])
+    with rc1: st.number_input("1.원사 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_yarn")
+    with rc2: st.text_input("원사 업체명", placeholder="Yarn Supplier", key="v_yarn")
+    with rc3: st.number_input("2.원단 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_fabric")
+    with rc4: st.text_input("원단 업체명", placeholder="Fabric Mill", key="v_fabric")
+    rc5, rc6, rc7, rc8 = st.columns([1, 1.5, 1, 1.5])
+    with rc5: st.number_input("3.원단가공 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_proc")
+    with rc6: st.text_input("가공 업체명", placeholder="Dyeing/Finishing", key="v_proc")
+    with rc7: st.number_input("4.봉제 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_sew")
+    with rc8: st.text_input("봉제 공장명", placeholder="Sewing Factory", key="v_sew")
+    rc9, rc10, rc11, rc12 = st.columns([1, 1.5, 1, 1.5])
+    with rc9: st.number_input("5.EPW ($)", min_value=0.0, format="%.2f", step=0.1, help="Embroidery, Printing, Washing", key="c_epw")
+    with rc10: st.text_input("EPW 업체명", placeholder="Emb/Print/Wash", key="v_epw")
+    with rc11: st.number_input("6.운반비 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_trans")
+    with rc12: st.text_input("운송 업체명", placeholder="Logistics", key="v_trans")
+    rc13, rc14, rc15, rc16 = st.columns([1, 1.5, 1, 1.5])
+    with rc13: st.number_input("7.배부비용 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_over")
+    with rc14: st.markdown("*(Internal Cost)*")
+    with rc15: st.number_input("➕ 추가 판관비 ($)", min_value=0.0, format="%.2f", step=0.1, key="c_sga")
+    with rc16: st.markdown("*(SG&A)*")
+
+    est_revenue, total_mfg_cost, total_sga, op_profit, op_margin = form_profit()
+
+    st.markdown("---")
+    st.subheader("📊 영업 수익성 분석")
+    col_est, col_act = st.columns(2)
+    with col_est:
+        st.info("**[예상 영업수익성] (Pre-shipment)**")
+        st.write(f"매출: ${est_revenue:,.2f} / 원가: ${total_mfg_cost:,.2f}")
+        st.write(f"**영업이익: ${op_profit:,.2f} ({op_margin:.1f}%)**")
+    with col_act:
+        st.success("**[확정 영업수익성] (Post-shipment)**")
+        st.write(f"매출: ${est_revenue:,.2f} / 원가: ${total_mfg_cost:,.2f}")
+        st.write(f"**영업이익: ${op_profit:,.2f} ({op_margin:.1f}%)**")
+
+def prefill_sewing_factory():
+    # 봉제 공장명이 비어 있거나 이전 상세 공장명 그대로면 새 상세 공장명으로 채움
+    ss = st.session_state
+    if not ss.get("v_sew") or ss.get("v_sew") == ss.get("sew_prefill"):
+        ss["v_sew"] = ss.detail_name
+    ss["sew_prefill"] = ss.detail_name
+
+def save_order(status):
+    ss = st.session_state
+    est_revenue, total_mfg_cost, total_sga, op_profit, op_margin = form_profit()
+    full_style_code = f"{ss.s_name}_{ss.s_year}_{ss.s_season}_{ss.s_fabric}_{ss.s_cat}_{ss.s_prod}_{ss.s_dest}"
+    new_order = {
+        "바이어": ss.buyer, "스타일": full_style_code, "오더명": ss.s_name, "연도": ss.s_year, "시즌": ss.s_season, 
+        "복종": ss.s_fabric, "카테고리": ss.s_cat, "생산국가": ss.s_prod, "수출국가": ss.s_dest, "수량": ss.qty, "단가": ss.unit_price,
+        "납기일": str(ss.del_date), "국가": ss.country, "생산구분": ss.prod_type, "상세공장명": ss.detail_name, "사용라인": ss.lines,
+        "상태": status, "진행상태": ss.current_stage, "매출($)": round(est_revenue, 2), "영업이익($)": round(op_profit, 2),
+        "이익률(%)": round(op_margin, 1), "V_Yarn": ss.v_yarn, "V_Fabric": ss.v_fabric, "V_Proc": ss.v_proc, 
+        "V_Sew": ss.v_sew, "V_EPW": ss.v_epw, "V_Trans": ss.v_trans, "ESG_Power": ss.sus_power, "ESG_Water": ss.sus_water, "ESG_Carbon": ss.sus_carbon,
+        **{field: ss.get(key, 0.0) for key, field in COST_FIELDS.items()}
+    }
+    data.add_order(new_order)
+
+@st.fragment
+@timed("order_entry")
+def order_entry():
+    st.subheader("📝 생산 오더 입력")
+    col_buyer, col_link1, col_link2, col_link3, col_link4 = st.columns([2, 1, 1, 1, 1], vertical_alignment="bottom")
+    with col_buyer: buyer = st.text_input("바이어 (Buyer)", placeholder="기업명을 입력하세요", key="buyer")
+    with col_link1: 
+        if buyer: st.link_button("신용도(구글)", f"https://www.google.com/search?q={buyer}+기업+실적+신용도", use_container_width=True)
+        else: st.button("신용도(구글)", disabled=True, use_container_width=True)
+    with col_link2: 
+        if buyer: st.link_button("신용도(Gemini)", "https://gemini.google.com/app", use_container_width=True)
+        else: st.button("신용도(Gemini)", disabled=True, use_container_width=True)
+    with col_link3: st.link_button("Oritain(TBD)", "https://oritain.com", use_container_width=True)
+    with col_link4: st.link_button("Altana 플랫폼", "https://www.altana.ai", use_container_width=True)
+    if buyer: st.caption(f"Tip: Gemini 버튼 클릭 후 **'{buyer} 실적과 신용도 알려줘'** 라고 질문하세요.")
+
+    st.markdown("##### 👕 스타일 기준 정보 입력")
+    s1, s2, s3, s4, s5, s6, s7 = st.columns(7)
+    s_name = s1.text_input("1.오더명", placeholder="ex) O-123", key="s_name")
+    s_year = s2.selectbox("2.연도", [str(y) for y in range(2025, 2031)], key="s_year")
+    s3.selectbox("3.시즌", ["C1", "C2", "C3", "C4"], key="s_season")
+    s4.selectbox("4.복종", ["Woven", "Knit", "Synthetic", "Other"], key="s_fabric")
+    s5.selectbox("5.카테고리", ["Ladies", "Men", "Adult", "Kids", "Girls", "Boys", "Toddler"], key="s_cat")
+    s6.selectbox("6.생산국가", ["VNM", "IDN", "MMR", "GTM", "NIC", "HTI", "ETC"], key="s_prod")
+    s7.selectbox("7.수출국가", ["USA", "Europe", "Japan", "Korea", "Other"], key="s_dest")
+
+    st.markdown("---")
+    c1, c2, c3, c4 = st.columns(4)
+    qty = c1.number_input("수량 (Q'ty)", min_value=0, step=100, key="qty")
+    c2.number_input("단가 ($ Unit Price)", min_value=0.0, step=0.1, format="%.2f", key="unit_price")
+    c3.date_input("납기일", datetime.now(), key="del_date")
+    country = c4.selectbox("🏭 배정 공장", list(data.factory_info.keys()), key="country")
+    c5, c6, c7 = st.columns([1, 2, 1])
+    prod_type = c5.selectbox("생산 구분", ["Main", "Outsourced"], key="prod_type")
+    c6.text_input("상세 공장명", placeholder="공장/라인 이름 입력", key="detail_name", on_change=prefill_sewing_factory)
+    lines = c7.number_input("필요 라인", min_value=1, value=1, key="lines")
+
+    st.markdown("---")
+    progress_tracking()
+
+    st.markdown("---")
+    st.subheader("🌿 지속가능경영 (Sustainability)")
+    sus1, sus2, sus3 = st.columns(3)
+    with sus1: st.number_input("전력 (kw)", min_value=0.0, step=100.0, key="sus_power")
+    with sus2: st.number_input("물 절감 (리터)", min_value=0.0, step=100.0, key="sus_water")
+    with sus3: st.number_input("기타 자원/탄소절감 (kg)", min_value=0.0, step=50.0, key="sus_carbon")
+    st.caption("*전력, 물 및 기타 자원 절감량을 탄소절감량으로 환산 가능함")
+
+    st.markdown("---")
+    cost_and_profitability()
+
+    st.write("") 
+    btn_col1, btn_col2 = st.columns([1, 1])
+    current_u = data.usage_index.used(country, prod_type, s_year)
+    limit = data.factory_info[country][prod_type]
+    is_capa_full = (current_u + lines > limit)
+
+    if btn_col1.button("📝 오더 등록 (Estimated Order)", use_container_width=True):
+        if not buyer or not s_name or qty == 0: st.error("필수 정보를 입력해주세요.")
+        else:
+            if is_capa_full: st.warning("Capa 초과 상태입니다.")
+            save_order("Estimated")
+            st.success("예상 오더 등록 완료!")
+            data_changed("order_entry", "orders")
+    if btn_col2.button("✅ 오더 확정 (Confirm Order)", type="primary", use_container_width=True):
+        if not buyer or not s_name or qty == 0: st.error("필수 정보를 입력해주세요.")
+        else:
+            save_order("Confirmed")
+            st.balloons()
+            st.success("오더 확정 완료!")
+            data_changed("order_entry", "orders")
+
+order_entry()
+
+# --- 6-1. 오더 일괄 등록 ---
+@st.fragment
+@timed("order_import")
+def order_import_panel():
+    with st.expander("📤 오더 일괄 등록 (Excel / CSV / Parquet)"):
+        ss = st.session_state
+        if ss.get("import_done"):
+            st.success(ss.pop("import_done"))
+        st.caption("필수 컬럼: " + ", ".join(order_import.REQUIRED_COLUMNS) + " · 원가 / 판관비는 개당 $ (입력 폼과 같은 식으로 수익성 계산)")
+        st.download_button("📄 양식 (엑셀) 받기", **download_args("order_import_template", ("order_import_template",), order_import.template, "xlsx", "Orders"))
+        upload = st.file_uploader("오더 시트", type=order_import.FILE_TYPES, key=f"import_file_{ss.get('import_round', 0)}")
+        if upload is None:
+            return
+        # 같은 파일은 다시 검증하지 않음 (Capa 비교는 현재 사용량 기준으로 매번)
+        cache_key = (upload.file_id, tuple(data.factory_info))
+        if ss.get("import_cache", (None,))[0] != cache_key:
+            try:
+                orders, errors = order_import.validate_orders(order_import.read_order_file(upload, upload.name), data.factory_info)
+            except Exception as e:
+                st.error(f"파일을 읽을 수 없습니다: {e}")
+                return
+            ss["import_cache"] = (cache_key, orders, errors)
+        _, orders, errors = ss["import_cache"]
+
+        valid = order_import.valid_rows(orders, errors)
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("전체 행", f"{len(orders):,}")
+        m2.metric("등록 가능", f"{len(valid):,}")
+        m3.metric("오류 행", f"{len(orders) - len(valid):,}")
+        m4.metric("예상 매출 ($)", f"{valid['매출($)'].sum():,.0f}")
+        if len(errors):
+            st.markdown("##### ❗ 행별 오류")
+            st.dataframe(errors, hide_index=True, use_container_width=True)
+        capa = order_import.capacity_check(valid, data.factory_info, data.usage_index)
+        st.markdown("##### 🏭 Capa 점검 (공장 / 생산구분 / 연도별)")
+        st.dataframe(capa, hide_index=True, use_container_width=True)
+        if capa["초과"].any():
+            st.warning("Capa 초과 상태인 공장이 있습니다.")
+
+        skip_errors = st.checkbox("오류 행을 제외하고 등록", disabled=not len(errors), key="import_skip")
+        blocked = valid.empty or (len(errors) > 0 and not skip_errors)
+        if st.button(f"📥 {len(valid):,}건 일괄 등록", type="primary", disabled=blocked, use_container_width=True):
+            data.add_orders(order_import.to_store_frame(valid))
+            ss["import_done"] = f"{len(valid):,}건 일괄 등록 완료!"
+            ss["import_round"] = ss.get("import_round", 0) + 1
+            ss.pop("import_cache", None)
+            data_changed("order_import", "orders")
+
+order_import_panel()
+
+# --- 7. 오더 리스트 / 분석 ---
+# 오더 리스트는 서버에서 필터 / 검색 / 페이지 나누기 후 보이는 페이지만 브라우저로 보냄
+LIST_COLUMNS = ["상태", "진행상태", "연도", "바이어", "스타일", "수량", "매출($)", "영업이익($)", "ESG_Carbon", "국가", "납기일"]
+LIST_FILTERS = {"상태": "상태", "연도": "연도", "바이어": "바이어", "국가": "공장", "진행상태": "진행상태"}
+PAGE_SIZES = [50, 100, 500]
+
+def list_export_frame(rows):
+    # 필터 / 검색이 없으면 버퍼를 그대로 참조하는 frame() 을 최근 등록 순으로 (복사 없음), 있으면 해당 행만 take
+    if len(rows) == len(data.orders):
+        return data.orders.frame().iloc[::-1]
+    return data.orders.take(rows)
+
+def reset_list_page():
+    st.session_state["list_page"] = 1
+
+@st.fragment
+@timed("order_list")
+def order_list():
+    c_list, c_fmt, c_down = st.columns([3.5, 0.5, 1], vertical_alignment="bottom")
+    c_list.subheader("📋 오더 리스트")
+    if data.orders:
+        search_col, *filter_cols = st.columns([2] + [1] * len(LIST_FILTERS))
+        query = search_col.text_input("🔍 바이어 / 스타일 검색", placeholder="ex) zara H-2024", key="list_query", on_change=reset_list_page)
+        filters = {name: col.multiselect(label, sorted(data.orders.categories(name)), key=f"list_f_{name}", on_change=reset_list_page)
+                   for col, (name, label) in zip(filter_cols, LIST_FILTERS.items())}
+        with section("order_list_query") as stats:
+            rows = find_rows(data.orders, filters, query, data.order_search)
+            stats["rows"] = len(rows)
+
+        p_size, p_page, p_info = st.columns([1, 1, 4], vertical_alignment="bottom")
+        page_size = p_size.selectbox("페이지당 행 수", PAGE_SIZES, key="list_page_size", on_change=reset_list_page)
+        pages = max(1, -(-len(rows) // page_size))
+        if st.session_state.get("list_page", 1) > pages:
+            reset_list_page()
+        page = p_page.number_input(f"페이지 (/ {pages:,})", min_value=1, max_value=pages, key="list_page")
+        start = (page - 1) * page_size
+        page_rows = rows[start:start + page_size]
+        p_info.caption(f"전체 {len(data.orders):,}건 중 {len(rows):,}건 · {start + 1 if len(rows) else 0:,}–{start + len(page_rows):,} 표시")
+        st.dataframe(data.orders.take(page_rows, LIST_COLUMNS), use_container_width=True, column_config={"납기일": st.column_config.DateColumn("납기일")})
+
+        # 저장은 현재 필터 / 검색 결과 전체 (모든 컬럼)
+        list_key = ("order_list", data.orders.version, query, tuple((k, tuple(v)) for k, v in filters.items()))
+        export_controls(c_fmt, c_down, "fmt_list", "리스트", "order_list", list_key, lambda: list_export_frame(rows))
+    else: st.info("등록된 오더가 없습니다.")
+
+@st.fragment
+@timed("order_analytics")
+def order_analytics():
+    st.subheader("📈 오더 분석(최대 10년)")
+    if data.orders:
+        anal_col1, anal_col2, anal_fmt, anal_col3 = st.columns([1, 1, 0.5, 1.5], vertical_alignment="bottom")
+        criteria = anal_col1.selectbox("📊 분석 기준 선택 (오더)", ["바이어", "복종", "카테고리", "생산국가", "수출국가", "시즌"])
+        metric = anal_col2.selectbox("📈 시각화 지표 (오더)", ["매출($)", "영업이익($)", "수량"])
+        try:
+            pivot_df = data.order_cube.slice(criteria, metric)
+            st.line_chart(pivot_df)
+            st.markdown("##### 📄 분석 데이터 상세 (Table)")
+            st.dataframe(pivot_df.style.format("{:,.0f}"), use_container_width=True)
+            export_controls(anal_fmt, anal_col3, "fmt_anal", f"'{criteria}'별 오더 분석 데이터", f"order_analysis_{criteria}",
+                            ("order_analysis", data.orders.version, criteria, metric), lambda: pivot_df, "Analytics", index=True, use_container_width=True)
+        except Exception as e: st.error(f"데이터 분석 중 오류가 발생했습니다: {e}")
+    else: st.info("분석할 데이터가 없습니다.")
+
+# 환율 / 원가 시나리오 (전체 오더 일괄 계산)
+SCENARIO_DIMENSIONS = {"국가": "공장", "바이어": "바이어", "연도": "연도"}
+SCENARIO_PATHS = [0, 1_000, 5_000, 10_000]
+SCENARIO_HORIZONS = [30, 90, 180]
+FX_VOL_DAYS = 365
+COST_LABELS = {"C_Yarn": "원사", "C_Fabric": "원단", "C_Proc": "원단가공", "C_Sew": "봉제", "C_EPW": "EPW",
+               "C_Trans": "운반비", "C_Over": "배부비용", "C_SGA": "판관비"}
+
+@st.fragment
+@timed("scenario")
+def scenario_analysis():
+    st.subheader("💹 환율 · 원가 시나리오 분석 (What-if)")
+    if not data.orders:
+        st.info("분석할 데이터가 없습니다.")
+        return
+    sc1, sc2, sc3 = st.columns(3)
+    dim = sc1.selectbox("📊 분석 기준 (시나리오)", list(SCENARIO_DIMENSIONS), format_func=SCENARIO_DIMENSIONS.get)
+    paths = sc2.selectbox("🎲 몬테카를로 경로 수", SCENARIO_PATHS, index=2, format_func=lambda n: f"{n:,}" if n else "사용 안 함")
+    horizon = sc3.selectbox("⏱️ 환율 변동 기간 (일)", SCENARIO_HORIZONS, index=1, disabled=not paths)
+    exposure = data.cost_exposure.exposure(dim, data.factory_info)
+    currencies = exposure[1][1:]
+
+    fx_col, cost_col = st.columns(2)
+    with fx_col.expander("💱 환율 충격 (USD 대비 현지 통화 약세 %, 음수는 강세)"):
+        fx_inputs = st.columns(3)
+        shocks = {c: fx_inputs[i % 3].number_input(c, value=0.0, step=1.0, format="%.1f", key=f"sc_fx_{c}") / 100
+                  for i, c in enumerate(currencies)}
+    with cost_col.expander("🧵 원가 항목 변동 (%)"):
+        cost_inputs = st.columns(4)
+        cost_change = {f: cost_inputs[i % 4].number_input(label, value=0.0, step=1.0, format="%.1f", key=f"sc_cost_{f}") / 100
+                       for i, (f, label) in enumerate(COST_LABELS.items())}
+    st.caption("봉제 · EPW · 운반비 · 배부비용은 배정 공장 현지 통화, 판관비는 KRW, 원사 · 원단 · 가공은 USD 로 지불한다고 가정. "
+               f"몬테카를로는 최근 {FX_VOL_DAYS}일 일간 환율 변동의 공분산으로 기간 말 환율을 뽑습니다.")
+
+    history, _ = get_fx_service().series(currencies, days=FX_VOL_DAYS) if paths else (pd.DataFrame(), None)
+    result = scenario.summarize(exposure, history, shocks, cost_change, paths, horizon)
+    if result.empty:
+        st.info("매출이 있는 (취소되지 않은) 오더가 없어 시나리오를 계산할 수 없습니다.")
+        return
+    result.index.name = SCENARIO_DIMENSIONS[dim]
+    margin_cols = [c for c in result.columns if c.endswith("(%)")]
+    st.bar_chart(result[[c for c in margin_cols if c != "적자 확률(%)"]], stack=False)
+    st.dataframe(result.style.format("{:,.0f}", subset=["매출($)"]).format("{:.2f}", subset=margin_cols), use_container_width=True)
+    sc_fmt, sc_down = st.columns([0.5, 1.5], vertical_alignment="bottom")
+    sc_key = ("scenario", data.orders.version, dim, paths, horizon, tuple(shocks.items()), tuple(cost_change.items()))
+    export_controls(sc_fmt, sc_down, "fmt_scenario", "시나리오 결과", f"scenario_{SCENARIO_DIMENSIONS[dim]}", sc_key, lambda: result,
+                    "Scenario", index=True, use_container_width=True)
+
+@st.fragment
+@timed("sales_analytics")
+def sales_analytics():
+    st.subheader("🛒 해당 스타일 매장 판매 현황(최대 10년)")
+    if data.sales:
+        sale_col1, sale_col2, sale_fmt, sale_col3 = st.columns([1, 1, 0.5, 1.5], vertical_alignment="bottom")
+        s_criteria = sale_col1.selectbox("📊 분석 기준 선택 (판매)", ["바이어", "카테고리", "판매지역"])
+        s_metric = sale_col2.selectbox("📈 시각화 지표 (판매)", ["판매금액($)", "판매량(Qty)", "정상가판매율(%)"])
+        try:
+            pivot_sales = data.sales_cube.slice(s_criteria, s_metric)
+            st.line_chart(pivot_sales)
+            st.markdown("##### 📄 매장 판매 데이터 상세 (Table)")
+            st.dataframe(pivot_sales.style.format("{:,.1f}" if s_metric=="정상가판매율(%)" else "{:,.0f}"), use_container_width=True)
+            export_controls(sale_fmt, sale_col3, "fmt_sales", f"'{s_criteria}'별 판매 현황 데이터", f"sales_analysis_{s_criteria}",
+                            ("sales_analysis", data.sales.version, s_criteria, s_metric), lambda: pivot_sales, "Sales_Analytics", index=True,
+                            use_container_width=True)
+        except Exception as e: st.error(f"판매 데이터 분석 중 오류가 발생했습니다: {e}")
+    else: st.info("판매 데이터가 없습니다.")
+
+# 생산(오더) 대비 매장 판매 (연도, 바이어, 카테고리 조인)
+SELL_THROUGH_PERCENT = ["판매율(%)", "정상가 판매율(%)"]
+
+@st.fragment
+@timed("sell_through")
+def sell_through_analysis():
+    st.subheader("🔗 생산 대비 매장 판매 (Sell-through)")
+    if not (data.orders and data.sales):
+        st.info("오더와 판매 데이터가 모두 있어야 분석할 수 있습니다.")
+        return
+    st_by, *filter_cols = st.columns([1.2, 1, 1, 1])
+    by = st_by.multiselect("📊 묶음 기준 (Sell-through)", SELL_THROUGH_KEYS, default=["바이어", "카테고리"])
+    # 선택지는 오더와 판매 어느 쪽에만 있는 값도 포함
+    filters = {name: col.multiselect(name, sorted(set(data.orders.categories(name)) | set(data.sales.categories(name))),
+                                     key=f"st_{key}")
+               for col, name, key in zip(filter_cols, SELL_THROUGH_KEYS, ["year", "buyer", "cat"])}
+    table = data.sell_through.table(by, filters)
+    if table.empty:
+        st.info("조건에 맞는 데이터가 없습니다.")
+        return
+    chart = table[SELL_THROUGH_PERCENT]
+    if isinstance(chart.index, pd.MultiIndex):
+        chart.index = [" / ".join(map(str, k)) for k in chart.index]
+    st.bar_chart(chart, stack=False)
+    st.caption("판매율 = 매장 판매량 / 생산수량(취소 제외 오더 수량), 정상가 판매율은 판매량 가중 평균입니다.")
+    count_cols = [c for c in table.columns if c not in SELL_THROUGH_PERCENT and c != "판매금액 / 오더매출"]
+    st.dataframe(table.style.format("{:,.0f}", subset=count_cols).format("{:.1f}", subset=SELL_THROUGH_PERCENT)
+                 .format("{:.2f}", subset=["판매금액 / 오더매출"]), use_container_width=True)
+    st_fmt, st_down = st.columns([0.5, 1.5], vertical_alignment="bottom")
+    st_key = ("sell_through", data.sell_through.version, tuple(by), tuple((k, tuple(v)) for k, v in filters.items()))
+    export_controls(st_fmt, st_down, "fmt_sell_through", "Sell-through 데이터", "sell_through", st_key, lambda: table, "Sell_Through",
+                    index=True, use_container_width=True)
+
+st.markdown("---")
+order_list()
+st.markdown("---")
+order_analytics()
+st.markdown("---")
+scenario_analysis()
+st.markdown("---")
+sales_analytics()
+st.markdown("---")
+sell_through_analysis()
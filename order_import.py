@@ -0,0 +1,158 @@
+"""오더 일괄 등록 (바이어 오더 시트 Excel / CSV / Parquet).
+
+파일 전체를 한 번에 검증하고, 입력 폼과 같은 calc_profit 식으로 수익성을 계산한 뒤
+배치 전체의 Capa 사용량을 공장별 한도와 비교한다. 등록은 SharedData.add_orders 한 번으로 한다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from costing import COST_COLUMNS, COST_FIELDS, SGA_COLUMN, calc_profit
+from profiler import section
+from store import ORDER_SCHEMA
+
+REQUIRED_COLUMNS = ["바이어", "오더명", "연도", "수량", "단가", "납기일", "국가", "생산구분"]
+TEXT_COLUMNS = ["바이어", "오더명", "스타일", "시즌", "복종", "카테고리", "생산국가", "수출국가", "국가", "생산구분",
+                "상세공장명", "상태", "진행상태", "V_Yarn", "V_Fabric", "V_Proc", "V_Sew", "V_EPW", "V_Trans"]
+# 비어 있으면 0 으로 보는 숫자 컬럼 (원가, 판관비, ESG)
+ZERO_COLUMNS = [*COST_COLUMNS.values(), SGA_COLUMN, "ESG_Power", "ESG_Water", "ESG_Carbon"]
+STATUSES = ["Estimated", "Confirmed"]
+PROD_TYPES = ["Main", "Outsourced"]
+DEFAULT_STATUS = "Estimated"
+DEFAULT_STAGE = "Planning"
+TEMPLATE_COLUMNS = ["바이어", "오더명", "연도", "시즌", "복종", "카테고리", "생산국가", "수출국가", "수량", "단가", "납기일",
+                    "국가", "생산구분", "상세공장명", "사용라인", "상태", "진행상태", *COST_COLUMNS.values(), SGA_COLUMN,
+                    "V_Yarn", "V_Fabric", "V_Proc", "V_Sew", "V_EPW", "V_Trans", "ESG_Power", "ESG_Water", "ESG_Carbon"]
+FILE_TYPES = ["xlsx", "csv", "parquet"]
+# 정수 컬럼 상한 (int64 변환과 합계가 넘치지 않는 범위)
+MAX_INT = 10 ** 12
+
+
+def read_order_file(file, name):
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".xlsx":
+        return pd.read_excel(file)
+    if ext == ".csv":
+        return pd.read_csv(file, encoding="utf-8-sig")
+    if ext == ".parquet":
+        return pd.read_parquet(file)
+    raise ValueError(f"지원하지 않는 파일 형식입니다: {name}")
+
+
+def template():
+    return pd.DataFrame(columns=TEMPLATE_COLUMNS)
+
+
+def _text(raw, name):
+    if name not in raw.columns:
+        return pd.Series(None, index=raw.index, dtype=object)
+    values = raw[name].astype("string").str.strip()
+    values = values.mask(values == "")
+    return values.astype(object).where(values.notna(), None)
+
+
+def _number(raw, name, default=np.nan):
+    # (값, 숫자로 읽을 수 없는 값이 들어 있는 행)
+    if name not in raw.columns:
+        return pd.Series(default, index=raw.index, dtype=np.float64), pd.Series(False, index=raw.index)
+    values = pd.to_numeric(raw[name], errors="coerce").astype(np.float64)
+    bad = (values.isna() & raw[name].notna()) | np.isinf(values)
+    return values.mask(np.isinf(values)).fillna(default), bad
+
+
+def validate_orders(raw, factory_info):
+    """(등록할 오더 DataFrame, 오류 DataFrame[행, 컬럼, 오류]) — 오더는 모든 행을 담고 오류 행은 errors 로 구분한다.
+
+    행 번호는 헤더가 1행인 파일 기준이다. 필수 컬럼이 없으면 ValueError.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in raw.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    raw = raw.reset_index(drop=True)
+    with section("import_validate", rows=len(raw)):
+        out = pd.DataFrame({name: _text(raw, name) for name in TEXT_COLUMNS})
+        checks = []
+
+        def check(mask, column, message):
+            checks.append((np.asarray(mask, dtype=bool), column, message))
+
+        check(out["바이어"].isna(), "바이어", "바이어가 비어 있습니다.")
+        check(out["오더명"].isna(), "오더명", "오더명이 비어 있습니다.")
+
+        year, bad = _number(raw, "연도")
+        valid = (year % 1 == 0) & (year.abs() < 10_000)
+        check(bad | ~valid, "연도", "연도는 숫자(예: 2025)여야 합니다.")
+        year = year.where(valid)
+        out["연도"] = year.astype("Int64").astype("string").astype(object).where(year.notna(), None)
+
+        qty, bad = _number(raw, "수량")
+        valid = (qty > 0) & (qty % 1 == 0) & (qty <= MAX_INT)
+        check(bad | ~valid, "수량", f"수량은 1 이상 {MAX_INT:,} 이하의 정수여야 합니다.")
+        out["수량"] = qty.where(valid, 0).astype(np.int64)
+
+        price, bad = _number(raw, "단가")
+        check(bad | price.isna() | (price < 0), "단가", "단가는 0 이상의 숫자여야 합니다.")
+        out["단가"] = price.fillna(0.0)
+
+        lines, bad = _number(raw, "사용라인", default=1)
+        valid = (lines >= 1) & (lines % 1 == 0) & (lines <= MAX_INT)
+        check(bad | ~valid, "사용라인", f"사용라인은 1 이상 {MAX_INT:,} 이하의 정수여야 합니다.")
+        out["사용라인"] = lines.where(valid, 1).astype(np.int64)
+
+        for name in ZERO_COLUMNS:
+            values, bad = _number(raw, name, default=0.0)
+            check(bad | (values < 0), name, "0 이상의 숫자여야 합니다.")
+            out[name] = values
+
+        due = pd.to_datetime(raw["납기일"], errors="coerce")
+        check(due.isna(), "납기일", "납기일을 날짜로 읽을 수 없습니다.")
+        out["납기일"] = due
+
+        check(~out["국가"].isin(list(factory_info)), "국가", "등록되지 않은 공장입니다.")
+        check(~out["생산구분"].isin(PROD_TYPES), "생산구분", f"생산구분은 {' / '.join(PROD_TYPES)} 중 하나여야 합니다.")
+        out["상태"] = out["상태"].fillna(DEFAULT_STATUS)
+        check(~out["상태"].isin(STATUSES), "상태", f"상태는 {' / '.join(STATUSES)} 중 하나여야 합니다.")
+        out["진행상태"] = out["진행상태"].fillna(DEFAULT_STAGE)
+
+        # 스타일 코드가 없으면 입력 폼과 같은 규칙으로 생성
+        parts = ["오더명", "연도", "시즌", "복종", "카테고리", "생산국가", "수출국가"]
+        generated = out[parts[0]].fillna("").astype(str)
+        for name in parts[1:]:
+            generated = generated + "_" + out[name].fillna("").astype(str)
+        out["스타일"] = out["스타일"].fillna(generated)
+
+        for key, field in COST_FIELDS.items():
+            out[field] = out[COST_COLUMNS.get(key, SGA_COLUMN)]
+
+        revenue, _, _, profit, margin = calc_profit(out["수량"], out["단가"], [out[c] for c in COST_COLUMNS.values()], out[SGA_COLUMN])
+        out["매출($)"] = np.round(revenue, 2)
+        out["영업이익($)"] = np.round(profit, 2)
+        out["이익률(%)"] = np.round(margin, 1)
+
+        errors = [pd.DataFrame({"행": np.flatnonzero(mask) + 2, "컬럼": column, "오류": message})
+                  for mask, column, message in checks if mask.any()]
+        errors = pd.concat(errors, ignore_index=True).sort_values("행", kind="stable") if errors else \
+            pd.DataFrame({"행": pd.Series(dtype=np.int64), "컬럼": pd.Series(dtype=object), "오류": pd.Series(dtype=object)})
+    return out, errors.reset_index(drop=True)
+
+
+def valid_rows(orders, errors):
+    return orders.drop(index=errors["행"].unique() - 2)
+
+
+def capacity_check(orders, factory_info, usage_index):
+    # 배치 전체를 (공장, 생산구분, 연도) 별로 합산해 기존 사용 라인과 함께 한도와 비교
+    if orders.empty:
+        return pd.DataFrame(columns=["공장", "생산구분", "연도", "기존 사용", "추가", "합계", "한도", "초과"])
+    added = orders.groupby(["국가", "생산구분", "연도"], sort=True)["사용라인"].sum().reset_index()
+    added.columns = ["공장", "생산구분", "연도", "추가"]
+    added.insert(3, "기존 사용", [usage_index.used(f, t, y) for f, t, y in zip(added["공장"], added["생산구분"], added["연도"])])
+    added["합계"] = added["기존 사용"] + added["추가"]
+    added["한도"] = [factory_info[f][t] for f, t in zip(added["공장"], added["생산구분"])]
+    added["초과"] = added["합계"] > added["한도"]
+    return added
+
+
+def to_store_frame(orders):
+    return orders[[c for c in ORDER_SCHEMA if c in orders.columns]]
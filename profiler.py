@@ -0,0 +1,146 @@
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import pandas as pd
+
+MAX_SAMPLES = 20_000
+PERCENTILES = (50, 90, 99)
+
+
+class Recorder:
+    """섹션별 실행 샘플 (시간, 처리 행 수, 최대 메모리) 을 프로세스 전체에서 모아두는 기록기.
+
+    세션과 재실행에 관계없이 최근 MAX_SAMPLES 개를 보관하므로 summary() 는 그 구간의 이동 백분위수다.
+    """
+
+    def __init__(self, maxlen=MAX_SAMPLES):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=maxlen)
+        self._total = 0
+
+    def record(self, name, seconds, rows=None, mem_kb=None):
+        with self._lock:
+            self._samples.append({"time": time.time(), "section": name, "seconds": seconds,
+                                  "rows": rows, "mem_kb": mem_kb})
+            self._total += 1
+
+    def mark(self):
+        with self._lock:
+            return self._total
+
+    def samples_since(self, mark):
+        with self._lock:
+            keep = max(0, min(self._total - mark, len(self._samples)))
+            return list(self._samples)[len(self._samples) - keep:]
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def frame(self):
+        df = pd.DataFrame(self.samples(), columns=["time", "section", "seconds", "rows", "mem_kb"])
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        df[["rows", "mem_kb"]] = df[["rows", "mem_kb"]].astype(float)
+        return df
+
+    def summary(self):
+        # 섹션별 호출 수 / 시간 백분위수(ms) / 평균 처리 행 수 / 평균 최대 메모리
+        df = self.frame()
+        if df.empty:
+            return pd.DataFrame()
+        grouped = df.groupby("section")
+        out = pd.DataFrame({"호출 수": grouped.size()})
+        for p in PERCENTILES:
+            out[f"p{p} (ms)"] = grouped["seconds"].quantile(p / 100) * 1000
+        out["합계 (s)"] = grouped["seconds"].sum()
+        out["평균 행 수"] = grouped["rows"].mean()
+        out["평균 최대 메모리 (KB)"] = grouped["mem_kb"].mean()
+        return out.sort_values(f"p{PERCENTILES[-1]} (ms)", ascending=False)
+
+
+RECORDER = Recorder()
+
+
+def memory_tracing():
+    return tracemalloc.is_tracing()
+
+
+def set_memory_tracing(enabled):
+    # 프로세스 전체 설정. tracemalloc 은 전체 실행을 몇 배 느리게 하므로 필요할 때만 켠다
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+# 진행 중인 최대 메모리 측정 구간. reset_peak() 는 프로세스 전체 값을 지우므로
+# 지우기 전에 그때까지의 최대값을 진행 중인 모든 구간에 반영해 둔다.
+_peak_frames = []
+_peak_lock = threading.Lock()
+
+
+def _fold_peak():
+    peak = tracemalloc.get_traced_memory()[1]
+    for frame in _peak_frames:
+        frame["peak"] = max(frame["peak"], peak)
+
+
+@contextmanager
+def peak_memory():
+    """블록 실행 중 시작 시점 대비 최대 추가 할당량(KB). 블록이 끝나면 yield 된 dict 의 "kb" 에 들어간다.
+
+    tracemalloc 이 꺼져 있으면 None. 다른 스레드의 할당도 함께 잡힌다.
+    """
+    frame = {"kb": None}
+    if not tracemalloc.is_tracing():
+        yield frame
+        return
+    with _peak_lock:
+        _fold_peak()
+        tracemalloc.reset_peak()
+        frame["start"] = frame["peak"] = tracemalloc.get_traced_memory()[0]
+        _peak_frames.append(frame)
+    try:
+        yield frame
+    finally:
+        with _peak_lock:
+            if tracemalloc.is_tracing():
+                _fold_peak()
+                frame["kb"] = (frame["peak"] - frame["start"]) / 1024
+            _peak_frames[:] = [f for f in _peak_frames if f is not frame]
+
+
+@contextmanager
+def section(name, rows=None):
+    """블록 실행 시간을 기록한다. 처리 행 수를 블록 안에서 알게 되면 yield 된 dict 의 "rows" 에 넣는다.
+
+    tracemalloc 이 켜져 있으면 블록 실행 중 최대 추가 할당량(KB)도 함께 기록한다 (중간에 해제된 메모리 포함).
+    """
+    stats = {"rows": rows}
+    mem = {"kb": None}
+    start = time.perf_counter()
+    try:
+        with peak_memory() as mem:
+            yield stats
+    finally:
+        seconds = time.perf_counter() - start
+        rows = stats["rows"]
+        RECORDER.record(name, seconds, None if rows is None else int(rows), mem["kb"])
+
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
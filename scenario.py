@@ -0,0 +1,120 @@
+"""환율 / 원가 변동 시나리오 (전체 오더 일괄 계산).
+
+원가 항목별 지불 통화(COST_CURRENCY)에 따라 오더 원가를 (분석 기준 멤버, 통화, 원가 항목) 으로 미리 합산해 두면
+시나리오 원가는 통화별 환율 비율 R 과 항목별 배율 m 에 대해 선형이다.
+
+    cost[s, g] = Σ_c R[s, c] · Σ_k A[g, c, k] · m[k]
+
+그래서 몬테카를로 경로 수천 개도 오더 수와 무관하게 (경로 x 통화) @ (통화 x 멤버) 행렬곱 한 번으로 끝난다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from capacity import EXCLUDED_STATUSES
+from costing import COST_CURRENCY, DEFAULT_COST_MIX
+from profiler import section
+
+COST_ITEMS = list(COST_CURRENCY)
+PERCENTILES = (5, 50, 95)
+
+
+class CostExposure:
+    """분석 기준(dim) 별 매출과 통화 x 원가 항목 원가 합계. 오더 데이터 버전이 바뀌기 전까지 캐시한다."""
+
+    def __init__(self, store):
+        self.store = store
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def exposure(self, dim, factory_info):
+        """(멤버 목록, 통화 목록, 매출[G], 원가 A[G, C, K]) — 통화 목록의 첫 항목은 USD (환율 영향 없음)."""
+        fx_map = tuple((f, info.get("Currency", "USD")) for f, info in factory_info.items())
+        key = (self.store.version, dim, fx_map)
+        with self._lock:
+            if key not in self._cache:
+                self._cache = {key: self._build(dim, dict(fx_map))}
+            return self._cache[key]
+
+    def _build(self, dim, factory_currency):
+        store = self.store
+        with store.lock, section("cost_exposure", rows=len(store)):
+            members = store.categories(dim)
+            codes = store.codes(dim).astype(np.int64)
+            statuses = store.categories("상태")
+            excluded = [c for c, s in enumerate(statuses) if s in EXCLUDED_STATUSES]
+            keep = (codes >= 0) & ~np.isin(store.codes("상태"), excluded)
+            qty = store.column("수량")[keep].astype(np.float64)
+            revenue = np.nan_to_num(store.column("매출($)")[keep])
+            profit = np.nan_to_num(store.column("영업이익($)")[keep])
+            unit = np.column_stack([store.column(name)[keep] for name in COST_ITEMS])
+            factories = store.categories("국가")
+            factory_codes = store.codes("국가")[keep]
+            codes = codes[keep]
+
+        # 원가 항목이 하나도 없는 (과거) 오더는 총원가를 기본 비율로 나눠 추정
+        legacy = np.isnan(unit).all(axis=1)
+        if legacy.any():
+            per_piece = np.divide(revenue - profit, qty, out=np.zeros_like(qty), where=qty > 0)
+            unit[legacy] = per_piece[legacy, None] * np.array(list(DEFAULT_COST_MIX.values()))
+        unit = np.nan_to_num(unit)
+
+        currencies = ["USD"] + sorted({c for c in COST_CURRENCY.values() if c not in ("USD", "local")}
+                                      | {c for c in factory_currency.values() if c != "USD"})
+        index = {c: i for i, c in enumerate(currencies)}
+        # 공장 코드 -> 현지 통화 번호 (마지막 칸: 공장 미지정 = USD)
+        local = np.array([index[factory_currency.get(f, "USD")] for f in factories] + [0], dtype=np.int64)
+        G, C, K = len(members), len(currencies), len(COST_ITEMS)
+        cost = np.zeros(G * C * K)
+        for k, name in enumerate(COST_ITEMS):
+            where = COST_CURRENCY[name]
+            cur = local[factory_codes] if where == "local" else np.full(len(codes), index[where])
+            cost += np.bincount((codes * C + cur) * K + k, weights=qty * unit[:, k], minlength=G * C * K)
+        sales = np.bincount(codes, weights=revenue, minlength=G)
+        active = sales > 0
+        return [m for m, a in zip(members, active) if a], currencies, sales[active], cost.reshape(G, C, K)[active]
+
+
+def rate_ratios(history, currencies, shocks, paths=0, horizon=30, seed=0):
+    """경로별 (현재 환율 / 시나리오 환율) 비율 [경로, 통화]. 원가의 달러 환산액에 곱한다.
+
+    shocks: 통화별 현지 통화 약세율 (0.05 = USD 대비 5% 약세). paths > 0 이면 최근 일간 로그수익률의
+    공분산으로 horizon 일 뒤 환율을 몬테카를로로 뽑아 충격 위에 더한다 (로그정규 가정이라 최종 시점만 뽑으면 된다).
+    """
+    base = np.array([np.log1p(shocks.get(c, 0.0)) for c in currencies])
+    if not paths:
+        return np.exp(-base)[None, :]
+    moves = np.zeros((paths, len(currencies)))
+    fx = [i for i, c in enumerate(currencies) if c != "USD" and c in history.columns]
+    if fx:
+        returns = np.log(history[[currencies[i] for i in fx]]).diff().iloc[1:].fillna(0.0)
+        cov = np.atleast_2d(np.cov(returns.to_numpy(), rowvar=False)) * horizon if len(returns) > 1 else np.zeros((len(fx), len(fx)))
+        moves[:, fx] = np.random.default_rng(seed).multivariate_normal(np.zeros(len(fx)), cov, size=paths, method="eigh")
+    return np.exp(-(base + moves))
+
+
+def margins(exposure, ratios, cost_change):
+    # [경로, 멤버] 영업이익률(%). cost_change: 원가 항목별 변동률 (0.1 = +10%)
+    _, _, sales, cost = exposure
+    multiplier = np.array([1.0 + cost_change.get(name, 0.0) for name in COST_ITEMS])
+    by_currency = cost @ multiplier                  # [G, C]
+    total = ratios @ by_currency.T                   # [S, G]
+    return (sales - total) / sales * 100
+
+
+def summarize(exposure, history, shocks, cost_change, paths=0, horizon=30, seed=0):
+    members, currencies, sales, cost = exposure
+    if not members:
+        return pd.DataFrame()
+    with section("scenario", rows=len(members) * max(paths, 1)):
+        baseline = margins(exposure, np.ones((1, len(currencies))), {})[0]
+        shocked = margins(exposure, rate_ratios(history, currencies, shocks), cost_change)[0]
+        out = pd.DataFrame({"매출($)": sales, "기준 이익률(%)": baseline, "시나리오 이익률(%)": shocked},
+                           index=pd.Index(members, name="기준"))
+        if paths:
+            sim = margins(exposure, rate_ratios(history, currencies, shocks, paths, horizon, seed), cost_change)
+            for p, values in zip(PERCENTILES, np.percentile(sim, PERCENTILES, axis=0)):
+                out[f"P{p}(%)"] = values
+            out["적자 확률(%)"] = (sim < 0).mean(axis=0) * 100
+    return out.sort_index()
@@ -0,0 +1,194 @@
+"""납기 주차 기준 주간 라인 배정 계획.
+
+미완료 오더(취소 제외, 납기가 계획 시작 주 이후)를 납기 순으로 놓고, 각 오더를 납기 주부터 거꾸로
+빈 라인에 채운다. 배정 공장의 해당 구분(Main / Outsourced)이 가득 차면 같은 공장의 다른 구분,
+그 다음 같은 Region 의 다른 공장 순으로 넘긴다. 오더 한 건은 한 공장 / 구분 안에서만 생산한다.
+
+Region 끼리는 서로 영향이 없으므로 Region 별로 따로 계획하고, 일정 간격으로 남은 Capa 를
+체크포인트로 남겨둔다. Capa 나 오더가 바뀌면 바뀐 내용이 처음 영향을 주는 오더 직전 체크포인트부터만 다시 계산한다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from capacity import EXCLUDED_STATUSES
+from profiler import section
+
+PROD_TYPES = ["Main", "Outsourced"]
+# 라인 1개가 한 주에 생산하는 수량 (오더 소요 = ceil(수량 / 이 값) 라인-주)
+PCS_PER_LINE_WEEK = 3_000
+CHECKPOINT_EVERY = 128
+
+
+def plan_start(day):
+    # 계획 시작 주의 월요일
+    day = pd.Timestamp(day).normalize()
+    return day - pd.Timedelta(days=day.weekday())
+
+
+def _allocate(remaining, due, width, need):
+    # remaining[:due+1] 을 납기 주부터 거꾸로 주당 최대 width 라인씩 채움. (시작 주, 주별 배정) 또는 None
+    take = np.minimum(remaining[due::-1], width)
+    filled = np.cumsum(take)
+    if not len(filled) or filled[-1] < need:
+        return None
+    k = int(np.searchsorted(filled, need))
+    used = take[:k + 1].copy()
+    used[k] -= filled[k] - need
+    remaining[due - k:due + 1] -= used[::-1]
+    return due - k
+
+
+class _RegionPlan:
+    """Region 하나의 계획 상태 (입력, 결과, 체크포인트)."""
+
+    def __init__(self):
+        self.resources = None
+        self.caps = None
+        self.inputs = None
+        self.n = 0
+        self.weeks = 0
+        self.result = None
+        self.first_touch = None
+        self.remaining = None
+        self.checkpoints = []
+
+    def replan(self, resources, caps, inputs, weeks, candidates):
+        rows = inputs["row"]
+        n = len(rows)
+        if resources != self.resources or self.inputs is None:
+            restart = 0
+        else:
+            restart = n
+            # 오더 입력이 처음 달라지는 위치
+            common = min(n, self.n)
+            for key, values in inputs.items():
+                diff = np.flatnonzero(values[:common] != self.inputs[key][:common])
+                if len(diff):
+                    restart = min(restart, int(diff[0]))
+            if self.n != n:
+                restart = min(restart, common)
+            # Capa 가 바뀐 자원을 처음 조회한 오더
+            for r in np.flatnonzero(caps != self.caps):
+                restart = min(restart, int(self.first_touch[r]))
+            if restart >= n and weeks <= self.weeks:
+                # 아무 오더도 조회하지 않은 자원의 Capa 만 바뀐 경우
+                self.remaining += (caps - self.caps)[:, None]
+                self.caps = caps
+                return 0
+
+        old = (self.result, self.first_touch)
+        self.resources, self.inputs, self.n = resources, inputs, n
+        self.weeks = max(weeks, self.weeks if restart else 0)
+        result = {"resource": np.full(n, -1, dtype=np.int64), "start": np.full(n, -1, dtype=np.int64)}
+        first_touch = np.full(len(resources), n, dtype=np.int64)
+        remaining = np.repeat(caps[:, None].astype(np.float64), self.weeks, axis=1)
+        self.checkpoints = [cp for cp in self.checkpoints if cp[0] <= restart] if restart else []
+        if self.checkpoints:
+            at, saved, saved_caps = self.checkpoints[-1]
+            restart = at
+            # 체크포인트 이후 바뀐 Capa 만큼 더하고 (그 전 오더는 바뀐 자원을 쓰지 않았음) 늘어난 주차는 새 Capa 로 채움
+            remaining[:, :saved.shape[1]] = saved + (caps - saved_caps)[:, None]
+            for key in result:
+                result[key][:at] = old[0][key][:at]
+            first_touch = np.where(old[1] < at, old[1], n)
+        else:
+            restart = 0
+
+        due, width, need = inputs["due"], inputs["width"], inputs["need"]
+        own = inputs["own"]
+        for i in range(restart, n):
+            if i % CHECKPOINT_EVERY == 0 and (not self.checkpoints or self.checkpoints[-1][0] < i):
+                self.checkpoints.append((i, remaining.copy(), caps))
+            for r in candidates[own[i]]:
+                first_touch[r] = min(first_touch[r], i)
+                start = _allocate(remaining[r], due[i], width[i], need[i])
+                if start is not None:
+                    result["resource"][i] = r
+                    result["start"][i] = start
+                    break
+        self.caps, self.result, self.first_touch = caps, result, first_touch
+        self.remaining = remaining
+        return n - restart
+
+
+class LineScheduler:
+    """오더 저장소 + 공장 정보로 Region 별 주간 라인 계획을 만들고 다음 계획 때 재사용한다."""
+
+    def __init__(self, store):
+        self.store = store
+        self._regions = {}
+        self._start = None
+        self._lock = threading.Lock()
+
+    def _open_orders(self, start):
+        store = self.store
+        with store.lock:
+            statuses = store.categories("상태")
+            excluded = [c for c, s in enumerate(statuses) if s in EXCLUDED_STATUSES]
+            due = store.column("납기일")
+            weeks = np.full(len(due), -1, dtype=np.int64)
+            known = ~np.isnat(due)
+            weeks[known] = (due[known] - start.to_datetime64()) // np.timedelta64(7, "D")
+            keep = (weeks >= 0) & ~np.isin(store.codes("상태"), excluded) & (store.codes("국가") >= 0)
+            rows = np.flatnonzero(keep)
+            return {
+                "row": rows, "due": weeks[rows],
+                "qty": store.column("수량")[rows], "lines": store.column("사용라인")[rows],
+                "factory": np.asarray(store.column("국가")[rows].astype(object)),
+                "type": np.asarray(store.column("생산구분")[rows].astype(object)),
+            }
+
+    def plan(self, factory_info, start):
+        """계획 결과: (오더별 배정 DataFrame, 주차 x 자원 사용 라인 DataFrame, 이번에 다시 계산한 오더 수)."""
+        start = plan_start(start)
+        with self._lock, section("line_schedule", rows=len(self.store)) as stats:
+            if start != self._start:
+                self._regions, self._start = {}, start
+            orders = self._open_orders(start)
+            regions = {}
+            for factory, info in factory_info.items():
+                regions.setdefault(info.get("Region", ""), []).append(factory)
+            frames, loads, replanned = [], [], 0
+            for region, factories in regions.items():
+                resources = [(f, t) for f in factories for t in PROD_TYPES]
+                caps = np.array([factory_info[f][t] for f, t in resources], dtype=np.float64)
+                index = {res: i for i, res in enumerate(resources)}
+                # 후보 자원 순서: 배정 공장 / 구분 -> 같은 공장 다른 구분 -> 같은 Region 다른 공장 (Main, Outsourced)
+                candidates = []
+                for f, t in resources:
+                    others = [index[(g, u)] for g in factories if g != f for u in PROD_TYPES]
+                    candidates.append([index[(f, t)], index[(f, PROD_TYPES[1 - PROD_TYPES.index(t)])]] + others)
+                mask = np.isin(orders["factory"], factories)
+                types = np.where(orders["type"][mask] == "Outsourced", "Outsourced", "Main")
+                own = np.array([index[(f, t)] for f, t in zip(orders["factory"][mask], types)], dtype=np.int64)
+                width = np.maximum(orders["lines"][mask], 1).astype(np.float64)
+                need = np.maximum(np.ceil(orders["qty"][mask] / PCS_PER_LINE_WEEK), 1)
+                due = orders["due"][mask]
+                order = np.lexsort((orders["row"][mask], due))
+                inputs = {"row": orders["row"][mask][order], "due": due[order], "own": own[order],
+                          "width": width[order], "need": need[order]}
+                weeks = int(due.max()) + 1 if len(due) else 1
+                plan = self._regions.setdefault(region, _RegionPlan())
+                replanned += plan.replan(resources, caps, inputs, weeks, candidates)
+                frames.append(self._frame(plan, resources))
+                loads.append(pd.DataFrame(caps[:, None] - plan.remaining, index=pd.MultiIndex.from_tuples(resources)).T)
+            stats["rows"] = replanned
+        schedule = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        load = pd.concat(loads, axis=1).fillna(0.0) if loads else pd.DataFrame()
+        load.index = start + pd.to_timedelta(load.index * 7, unit="D")
+        return schedule, load, replanned
+
+    def _frame(self, plan, resources):
+        inputs, result = plan.inputs, plan.result
+        own = [resources[r] for r in inputs["own"]]
+        got = [resources[r] if r >= 0 else (None, None) for r in result["resource"]]
+        status = np.where(result["resource"] < 0, "미배정",
+                          np.where(result["resource"] == inputs["own"], "정상",
+                                   np.where([o[0] == g[0] for o, g in zip(own, got)], "구분 전환", "공장 이동")))
+        return pd.DataFrame({
+            "No.": inputs["row"], "원 공장": [o[0] for o in own], "원 구분": [o[1] for o in own],
+            "배정 공장": [g[0] for g in got], "배정 구분": [g[1] for g in got],
+            "시작 주": result["start"], "납기 주": inputs["due"], "라인-주": inputs["need"], "상태": status,
+        })
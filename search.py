@@ -0,0 +1,115 @@
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from profiler import section
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """문자열 컬럼들에 대한 부분 문자열 검색 색인 (대소문자 무시).
+
+    행 대신 고유 값(term) 단위로 trigram 을 색인하고, 행마다는 term 번호만 배열로 들고 있다.
+    검색은 trigram 교집합으로 후보 term 을 좁혀 확인한 뒤 np.isin 한 번으로 행 마스크를 만든다.
+    ColumnStore 에 subscribe 해서 쓰며, 수정된 행은 on_rows_added 에서 term 번호를 덮어쓴다.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._terms = []
+        self._term_ids = {}
+        self._grams = defaultdict(set)
+        self._row_terms = {name: np.full(1024, -1, dtype=np.int32) for name in self.columns}
+        self._matches = {}
+        self._lock = threading.Lock()
+
+    def _term_id(self, value):
+        term = str(value).lower()
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._terms.append(term)
+            self._term_ids[term] = term_id
+            for gram in trigrams(term):
+                self._grams[gram].add(term_id)
+            self._matches.clear()
+        return term_id
+
+    def _reserve(self, total):
+        for name, arr in self._row_terms.items():
+            if total > len(arr):
+                grown = np.full(max(total, 2 * len(arr)), -1, dtype=np.int32)
+                grown[:len(arr)] = arr
+                self._row_terms[name] = grown
+
+    # --- ColumnStore listener ---
+    def on_rows_added(self, store, rows):
+        if len(rows) == 0:
+            return
+        with section("search_index", rows=len(rows)), self._lock:
+            self._reserve(rows.stop)
+            sl = slice(rows.start, rows.stop)
+            for name in self.columns:
+                codes, uniques = pd.factorize(store.column(name)[sl])
+                ids = np.array([self._term_id(v) for v in uniques], dtype=np.int32)
+                self._row_terms[name][sl] = np.where(codes >= 0, ids[codes] if len(ids) else -1, -1)
+
+    def on_row_discarded(self, store, row):
+        pass
+
+    # --- 조회 ---
+    def matching_terms(self, word):
+        word = word.lower()
+        with self._lock:
+            hit = self._matches.get(word)
+            if hit is not None:
+                return hit
+            if len(word) < 3:
+                # trigram 으로 좁힐 수 없는 짧은 검색어는 고유 값 전체를 확인
+                candidates = range(len(self._terms))
+            else:
+                grams = sorted((self._grams.get(g, set()) for g in trigrams(word)), key=len)
+                candidates = set.intersection(*grams)
+            hit = np.array([t for t in candidates if word in self._terms[t]], dtype=np.int32)
+            self._matches[word] = hit
+            return hit
+
+    def mask(self, text, n):
+        # 공백으로 나눈 검색어가 모두 (어느 컬럼이든) 포함된 행
+        mask = np.ones(n, dtype=bool)
+        for word in text.split():
+            ids = self.matching_terms(word)
+            with self._lock:
+                hit = np.zeros(n, dtype=bool)
+                for name in self.columns:
+                    hit |= _lookup(self._row_terms[name][:n], ids, len(self._terms))
+            mask &= hit
+        return mask
+
+
+def _lookup(codes, wanted, n_values):
+    # np.isin 대신 값 개수 크기의 bool 표로 조회 (코드 -1 은 마지막 칸 = False)
+    table = np.zeros(n_values + 1, dtype=bool)
+    table[wanted] = True
+    return table[codes]
+
+
+def find_rows(store, filters=None, text="", index=None):
+    """필터 (컬럼 -> 허용 값 목록, 카테고리 컬럼) 와 검색어에 맞는 행 번호 (최근 등록 순)."""
+    with store.lock:
+        n = len(store)
+        mask = np.ones(n, dtype=bool)
+        for name, values in (filters or {}).items():
+            if values:
+                wanted = set(values)
+                categories = store.categories(name)
+                codes = [c for c, v in enumerate(categories) if v in wanted]
+                mask &= _lookup(store.codes(name), codes, len(categories))
+        if text.strip() and index is not None:
+            mask &= index.mask(text, n)
+    return np.flatnonzero(mask)[::-1]
@@ -0,0 +1,375 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import pandas as pd
+
+from store import ColumnStore, ORDER_SCHEMA, SALES_SCHEMA
+from capacity import CapaUsageIndex
+from search import TrigramIndex
+from scenario import CostExposure
+from scheduler import LineScheduler
+from analytics import (Cube, SellThrough, ORDER_DIMENSIONS, ORDER_MEASURES,
+                       SALES_DIMENSIONS, SALES_MEASURES, SALES_MEAN_MEASURES)
+
+_SQL_TYPES = {"cat": "TEXT", "str": "TEXT", "date": "TEXT", "int": "INTEGER", "float": "REAL"}
+HISTORY_COLUMNS = ["time", "factory", "type", "old", "new"]
+
+
+def _arrow_schema(schema):
+    import pyarrow as pa
+    types = {"cat": pa.string(), "str": pa.string(), "date": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    return pa.schema([("row_id", pa.int64())] + [(name, types[kind]) for name, kind in schema.items()])
+
+
+def _to_rows(df, schema):
+    # DataFrame -> 저장용 컬럼 순서의 튜플 목록 (날짜는 ISO 문자열)
+    out = pd.DataFrame(index=df.index)
+    for name, kind in schema.items():
+        if name not in df.columns:
+            out[name] = None
+        elif kind == "date":
+            out[name] = pd.to_datetime(df[name], errors="coerce").dt.strftime("%Y-%m-%d")
+        else:
+            out[name] = df[name]
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
+
+
+class StoreOutOfDate(Exception):
+    """다른 프로세스가 먼저 행을 추가해 start_row 가 저장소의 다음 row_id 와 다름."""
+
+    def __init__(self, table, next_row):
+        super().__init__(f"{table}: 다음 row_id 는 {next_row} 입니다.")
+        self.table = table
+        self.next_row = next_row
+
+
+class StorageBackend(ABC):
+    """오더 / 판매 / 공장 정보 / Capa 이력을 보관하는 저장소 인터페이스.
+
+    append_* 는 start_row 가 저장소의 다음 row_id 와 다르면 StoreOutOfDate 를 낸다.
+    """
+
+    @abstractmethod
+    def is_empty(self): ...
+
+    @abstractmethod
+    def count(self, table):
+        # table: "orders" 또는 "sales"
+        ...
+
+    @abstractmethod
+    def load_orders(self, start_row=0): ...
+
+    @abstractmethod
+    def append_orders(self, df, start_row): ...
+
+    @abstractmethod
+    def update_order(self, row_id, values): ...
+
+    @abstractmethod
+    def load_sales(self, start_row=0): ...
+
+    @abstractmethod
+    def append_sales(self, df, start_row): ...
+
+    @abstractmethod
+    def load_factory_info(self): ...
+
+    @abstractmethod
+    def save_factory_info(self, factory_info): ...
+
+    @abstractmethod
+    def append_history(self, entry): ...
+
+    @abstractmethod
+    def load_history(self): ...
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        def cols(schema):
+            return ", ".join(f'"{name}" {_SQL_TYPES[kind]}' for name, kind in schema.items())
+        with self._lock:
+            self._conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS orders (row_id INTEGER PRIMARY KEY, {cols(ORDER_SCHEMA)});
+                CREATE INDEX IF NOT EXISTS ix_orders_year ON orders ("연도");
+                CREATE INDEX IF NOT EXISTS ix_orders_buyer ON orders ("바이어");
+                CREATE INDEX IF NOT EXISTS ix_orders_factory ON orders ("국가");
+                CREATE TABLE IF NOT EXISTS sales (row_id INTEGER PRIMARY KEY, {cols(SALES_SCHEMA)});
+                CREATE INDEX IF NOT EXISTS ix_sales_year ON sales ("연도");
+                CREATE INDEX IF NOT EXISTS ix_sales_buyer ON sales ("바이어");
+                CREATE TABLE IF NOT EXISTS factory_info (
+                    factory TEXT PRIMARY KEY, pos INTEGER, region TEXT, main INTEGER, outsourced INTEGER, currency TEXT);
+                CREATE TABLE IF NOT EXISTS history_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT, time TEXT, factory TEXT, type TEXT, old INTEGER, new INTEGER);
+            """)
+            # 스키마에 나중에 추가된 컬럼은 기존 파일에 NULL 컬럼으로 추가
+            for table, schema in (("orders", ORDER_SCHEMA), ("sales", SALES_SCHEMA)):
+                existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                for name, kind in schema.items():
+                    if name not in existing:
+                        self._conn.execute(f'ALTER TABLE {table} ADD COLUMN "{name}" {_SQL_TYPES[kind]}')
+
+    def _read(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def _insert(self, table, schema, df, start_row):
+        rows = [(start_row + i, *row) for i, row in enumerate(_to_rows(df, schema))]
+        names = ", ".join(f'"{n}"' for n in schema)
+        marks = ", ".join("?" * (len(schema) + 1))
+        with self._lock:
+            # 쓰기 잠금을 먼저 잡고 다음 row_id 를 확인 (CLI 등 다른 프로세스가 같은 파일에 추가했을 수 있음)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                next_row = self._conn.execute(f"SELECT COALESCE(MAX(row_id) + 1, 0) FROM {table}").fetchone()[0]
+                if next_row != start_row:
+                    raise StoreOutOfDate(table, next_row)
+                self._conn.executemany(f"INSERT INTO {table} (row_id, {names}) VALUES ({marks})", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM factory_info").fetchone()[0] == 0
+
+    def count(self, table):
+        if table not in ("orders", "sales"):
+            raise ValueError(table)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def load_orders(self, start_row=0):
+        return self._read("SELECT * FROM orders WHERE row_id >= ? ORDER BY row_id", (start_row,)).drop(columns="row_id")
+
+    def append_orders(self, df, start_row):
+        self._insert("orders", ORDER_SCHEMA, df, start_row)
+
+    def update_order(self, row_id, values):
+        rows = _to_rows(pd.DataFrame([values]), {k: ORDER_SCHEMA[k] for k in values})
+        sets = ", ".join(f'"{k}" = ?' for k in values)
+        with self._lock:
+            self._conn.execute(f"UPDATE orders SET {sets} WHERE row_id = ?", (*rows[0], row_id))
+
+    def load_sales(self, start_row=0):
+        return self._read("SELECT * FROM sales WHERE row_id >= ? ORDER BY row_id", (start_row,)).drop(columns="row_id")
+
+    def append_sales(self, df, start_row):
+        self._insert("sales", SALES_SCHEMA, df, start_row)
+
+    def load_factory_info(self):
+        df = self._read("SELECT * FROM factory_info ORDER BY pos")
+        return {r.factory: {"Region": r.region, "Main": int(r.main), "Outsourced": int(r.outsourced), "Currency": r.currency}
+                for r in df.itertuples()}
+
+    def save_factory_info(self, factory_info):
+        rows = [(f, pos, i["Region"], int(i["Main"]), int(i["Outsourced"]), i["Currency"])
+                for pos, (f, i) in enumerate(factory_info.items())]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO factory_info VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def append_history(self, entry):
+        with self._lock:
+            self._conn.execute("INSERT INTO history_log (time, factory, type, old, new) VALUES (?, ?, ?, ?, ?)",
+                               tuple(entry[c] for c in HISTORY_COLUMNS))
+
+    def load_history(self):
+        return self._read("SELECT time, factory, type, old, new FROM history_log ORDER BY seq").to_dict("records")
+
+
+class ParquetBackend(StorageBackend):
+    # 오더 / 판매는 part 파일을 추가하는 방식, 수정 / 이력은 JSONL 저널에 append
+    def __init__(self, path):
+        import pyarrow  # noqa: F401  (parquet 백엔드 선택 시에만 필요)
+        self.path = path
+        self._lock = threading.Lock()
+        for sub in ("orders", "sales"):
+            os.makedirs(os.path.join(path, sub), exist_ok=True)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _write_part(self, table, schema, df, start_row):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        part = pd.DataFrame(_to_rows(df, schema), columns=list(schema))
+        part.insert(0, "row_id", range(start_row, start_row + len(part)))
+        table_data = pa.Table.from_pandas(part, schema=_arrow_schema(schema), preserve_index=False)
+        with self._lock:
+            next_row = self.count(table)
+            if next_row != start_row:
+                raise StoreOutOfDate(table, next_row)
+            parts = len([f for f in os.listdir(self._file(table)) if not f.startswith(".")])
+            # 숨김 임시 파일에 쓴 뒤 교체 -> 일괄 적재가 중간에 실패해도 반쪽 파일이 남지 않음
+            target = self._file(os.path.join(table, f"part-{parts:05d}.parquet"))
+            temp = self._file(os.path.join(table, f".part-{parts:05d}.tmp"))
+            pq.write_table(table_data, temp)
+            os.replace(temp, target)
+
+    def _read_table(self, table, filters=None):
+        folder = self._file(table)
+        if not os.listdir(folder):
+            return pd.DataFrame(columns=["row_id"])
+        # 현재 스키마로 읽어 이전 part 파일에 없는 컬럼은 null 로 채움
+        schema = _arrow_schema({"orders": ORDER_SCHEMA, "sales": SALES_SCHEMA}[table])
+        return pd.read_parquet(folder, filters=filters, schema=schema).sort_values("row_id")
+
+    def _journal(self, name, entry):
+        with self._lock, open(self._file(name), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def _read_journal(self, name):
+        if not os.path.exists(self._file(name)):
+            return []
+        with open(self._file(name), encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def is_empty(self):
+        return not os.path.exists(self._file("factory_info.json"))
+
+    def count(self, table):
+        import pyarrow.parquet as pq
+        folder = self._file(table)
+        return sum(pq.ParquetFile(os.path.join(folder, name)).metadata.num_rows
+                   for name in os.listdir(folder) if not name.startswith("."))
+
+    def load_orders(self, start_row=0):
+        df = self._read_table("orders", [("row_id", ">=", start_row)] if start_row else None).set_index("row_id")
+        for entry in self._read_journal("order_updates.jsonl"):
+            if entry["row_id"] >= start_row:
+                for name, value in entry["values"].items():
+                    df.at[entry["row_id"], name] = value
+        return df.reset_index(drop=True)
+
+    def append_orders(self, df, start_row):
+        self._write_part("orders", ORDER_SCHEMA, df, start_row)
+
+    def update_order(self, row_id, values):
+        self._journal("order_updates.jsonl", {"row_id": row_id, "values": values})
+
+    def load_sales(self, start_row=0):
+        return self._read_table("sales", [("row_id", ">=", start_row)] if start_row else None).drop(columns="row_id")
+
+    def append_sales(self, df, start_row):
+        self._write_part("sales", SALES_SCHEMA, df, start_row)
+
+    def load_factory_info(self):
+        with open(self._file("factory_info.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_factory_info(self, factory_info):
+        tmp = self._file("factory_info.json.tmp")
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(factory_info, f, ensure_ascii=False)
+            os.replace(tmp, self._file("factory_info.json"))
+
+    def append_history(self, entry):
+        self._journal("history_log.jsonl", entry)
+
+    def load_history(self):
+        return self._read_journal("history_log.jsonl")
+
+
+def open_backend(url):
+    # "sqlite:///상대경로.sqlite3", "sqlite:////절대경로.sqlite3", "parquet:///디렉터리"
+    scheme, _, path = url.partition("://")
+    path = path[1:] if path.startswith("/") else path
+    if scheme == "sqlite":
+        return SQLiteBackend(path)
+    if scheme == "parquet":
+        return ParquetBackend(path)
+    raise ValueError(f"지원하지 않는 저장소입니다: {url}")
+
+
+class SharedData:
+    """모든 세션이 공유하는 오더 / 판매 / 공장 정보 / Capa 이력 (저장소에서 한 번 적재)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        # 적재할 때마다 새로 정하는 식별자. 저장소 version 은 다시 적재하면 처음부터 세므로
+        # 버전 기반 캐시 키에는 이 값도 함께 넣는다
+        self.uid = uuid.uuid4().hex
+        self._lock = threading.RLock()
+        self.factory_info = backend.load_factory_info()
+        self.history_log = backend.load_history()
+        self.orders = ColumnStore(ORDER_SCHEMA)
+        self.orders.extend(backend.load_orders())
+        self.sales = ColumnStore(SALES_SCHEMA)
+        self.sales.extend(backend.load_sales())
+        self.usage_index = CapaUsageIndex()
+        self.orders.subscribe(self.usage_index)
+        self.order_cube = Cube(ORDER_DIMENSIONS, ORDER_MEASURES)
+        self.orders.subscribe(self.order_cube)
+        self.sales_cube = Cube(SALES_DIMENSIONS, SALES_MEASURES, SALES_MEAN_MEASURES)
+        self.sales.subscribe(self.sales_cube)
+        self.sell_through = SellThrough()
+        self.orders.subscribe(self.sell_through.orders)
+        self.sales.subscribe(self.sell_through.sales)
+        self.order_search = TrigramIndex(["바이어", "스타일"])
+        self.orders.subscribe(self.order_search)
+        self.cost_exposure = CostExposure(self.orders)
+        self.scheduler = LineScheduler(self.orders)
+
+    @classmethod
+    def open(cls, url, seed=None):
+        backend = open_backend(url)
+        if backend.is_empty() and seed is not None:
+            factory_info, orders, sales = seed()
+            backend.append_orders(pd.DataFrame(orders), 0)
+            backend.append_sales(pd.DataFrame(sales), 0)
+            backend.save_factory_info(factory_info)
+        return cls(backend)
+
+    def _append(self, store, append, load, df):
+        # 다른 프로세스(CLI 등)가 먼저 추가한 행이 있으면 메모리로 읽어 들인 뒤 그 뒤에 이어서 저장
+        while True:
+            try:
+                append(df, len(store))
+                return
+            except StoreOutOfDate as e:
+                missing = load(len(store)) if e.next_row > len(store) else None
+                if missing is None or missing.empty:
+                    raise
+                store.extend(missing)
+
+    def add_order(self, record):
+        with self._lock:
+            self._append(self.orders, self.backend.append_orders, self.backend.load_orders, pd.DataFrame([record]))
+            return self.orders.append(record)
+
+    def add_orders(self, df):
+        with self._lock:
+            self._append(self.orders, self.backend.append_orders, self.backend.load_orders, df)
+            return self.orders.extend(df)
+
+    def update_order(self, row, values):
+        with self._lock:
+            self.backend.update_order(row, values)
+            self.orders.update(row, values)
+
+    def set_capa(self, factory, prod_type, value):
+        with self._lock:
+            old = self.factory_info[factory][prod_type]
+            entry = {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                     "factory": factory, "type": prod_type, "old": int(old), "new": int(value)}
+            self.backend.append_history(entry)
+            self.factory_info[factory][prod_type] = int(value)
+            self.backend.save_factory_info(self.factory_info)
+            self.history_log.append(entry)
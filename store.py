@@ -0,0 +1,245 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from profiler import section
+
+# --- 컬럼 스키마 ---
+# cat: 카테고리(코드 배열 + 카테고리 목록), int / float: 숫자, str: 문자열(object), date: 날짜
+ORDER_SCHEMA = {
+    "상태": "cat", "진행상태": "cat", "연도": "cat", "바이어": "cat", "스타일": "str", "오더명": "str",
+    "시즌": "cat", "복종": "cat", "카테고리": "cat", "생산국가": "cat", "수출국가": "cat",
+    "수량": "int", "단가": "float", "납기일": "date", "국가": "cat", "생산구분": "cat",
+    "상세공장명": "str", "사용라인": "int",
+    "매출($)": "float", "영업이익($)": "float", "이익률(%)": "float",
+    "V_Yarn": "str", "V_Fabric": "str", "V_Proc": "str", "V_Sew": "str", "V_EPW": "str", "V_Trans": "str",
+    "ESG_Power": "float", "ESG_Water": "float", "ESG_Carbon": "float",
+    # 개당 원가 구성 ($)
+    "C_Yarn": "float", "C_Fabric": "float", "C_Proc": "float", "C_Sew": "float",
+    "C_EPW": "float", "C_Trans": "float", "C_Over": "float", "C_SGA": "float",
+}
+
+SALES_SCHEMA = {
+    "연도": "cat", "바이어": "cat", "카테고리": "cat", "판매지역": "cat",
+    "판매량(Qty)": "int", "판매금액($)": "float", "정상가판매율(%)": "float",
+}
+
+_DTYPES = {"int": np.int64, "float": np.float64, "str": object, "date": "datetime64[ns]"}
+_MISSING = {"int": 0, "float": np.nan, "str": None, "date": np.datetime64("NaT")}
+
+
+def _code_dtype(n_categories):
+    # pandas 가 from_codes 에서 고르는 정수 타입과 맞춰야 Categorical.codes 가 버퍼의 view 가 됨
+    # (dtype 이 다르면 from_codes 가 변환 복사). Series.cat.codes 는 새 Series 를 만들며 복사하므로
+    # 원본 코드가 필요하면 ColumnStore.codes() 를 쓴다.
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class ColumnStore:
+    """스키마별 타입 컬럼(numpy 배열)으로 행을 쌓아두는 저장소.
+
+    frame() 은 내부 버퍼를 그대로 참조하는 DataFrame 을 돌려주고 (카테고리 컬럼은 .array.codes 가 버퍼 view), 데이터가 바뀌지 않는 한
+    (version 동일) 같은 객체를 재사용한다. 여러 세션(스레드)이 공유할 수 있도록 쓰기와
+    frame 생성은 lock 안에서 수행한다.
+    """
+
+    def __init__(self, schema, capacity=1024):
+        self.schema = dict(schema)
+        self.version = 0
+        self._n = 0
+        self._capacity = max(int(capacity), 16)
+        self._cols = {}
+        self._categories = {}
+        self._cat_lookup = {}
+        for name, kind in self.schema.items():
+            if kind == "cat":
+                self._categories[name] = []
+                self._cat_lookup[name] = {}
+                self._cols[name] = np.full(self._capacity, -1, dtype=_code_dtype(0))
+            else:
+                self._cols[name] = np.full(self._capacity, _MISSING[kind], dtype=_DTYPES[kind])
+        self._frame_cache = None
+        self._listeners = []
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return self._n
+
+    def subscribe(self, listener):
+        # listener: on_rows_added(store, rows), on_row_discarded(store, row)
+        with self.lock:
+            self._listeners.append(listener)
+            listener.on_rows_added(self, range(0, self._n))
+
+    # --- 버퍼 관리 ---
+    def _reserve(self, total):
+        if total <= self._capacity:
+            return
+        new_cap = self._capacity
+        while new_cap < total:
+            new_cap *= 2
+        for name, kind in self.schema.items():
+            old = self._cols[name]
+            fill = -1 if kind == "cat" else _MISSING[kind]
+            grown = np.full(new_cap, fill, dtype=old.dtype)
+            grown[:self._n] = old[:self._n]
+            self._cols[name] = grown
+        self._capacity = new_cap
+
+    def _category_code(self, name, value):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return -1
+        value = str(value)
+        lookup = self._cat_lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self._categories[name])
+            self._categories[name].append(value)
+            lookup[value] = code
+            self._widen_codes(name)
+        return code
+
+    def _widen_codes(self, name):
+        need = _code_dtype(len(self._categories[name]))
+        if self._cols[name].dtype != need:
+            self._cols[name] = self._cols[name].astype(need)
+
+    @staticmethod
+    def _coerce(kind, value):
+        if value is None:
+            return _MISSING[kind]
+        if kind == "date":
+            return np.datetime64(pd.Timestamp(value), "ns")
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        return value
+
+    # --- 쓰기 ---
+    def append(self, record):
+        with self.lock:
+            self._reserve(self._n + 1)
+            row = self._n
+            for name, kind in self.schema.items():
+                value = record.get(name)
+                if kind == "cat":
+                    self._cols[name][row] = self._category_code(name, value)
+                else:
+                    self._cols[name][row] = self._coerce(kind, value)
+            self._n += 1
+            self.version += 1
+            for listener in self._listeners:
+                listener.on_rows_added(self, range(row, row + 1))
+            return row
+
+    def extend(self, df):
+        # DataFrame 단위 일괄 적재 (컬럼별 벡터 연산)
+        with self.lock:
+            count = len(df)
+            if count == 0:
+                return range(self._n, self._n)
+            self._reserve(self._n + count)
+            start, end = self._n, self._n + count
+            for name, kind in self.schema.items():
+                if name not in df.columns:
+                    continue
+                values = df[name]
+                if kind == "cat" and isinstance(values.dtype, pd.CategoricalDtype):
+                    # 카테고리 입력은 카테고리 목록만 매핑하고 코드는 그대로 변환
+                    labels = values.cat.categories.astype(str)
+                    for value in labels:
+                        self._category_code(name, value)
+                    mapping = pd.Index(self._categories[name], dtype=object).get_indexer(labels)
+                    codes = values.cat.codes.to_numpy()
+                    self._cols[name][start:end] = np.where(codes >= 0, mapping[codes], -1)
+                elif kind == "cat":
+                    mask = values.notna().to_numpy()
+                    keys = np.full(count, None, dtype=object)
+                    keys[mask] = values[mask].astype(str).to_numpy(dtype=object)
+                    for value in pd.unique(keys[mask]):
+                        self._category_code(name, value)
+                    cats = pd.Index(self._categories[name], dtype=object)
+                    self._cols[name][start:end] = cats.get_indexer(keys)
+                elif kind == "date":
+                    self._cols[name][start:end] = pd.to_datetime(values, errors="coerce").to_numpy("datetime64[ns]")
+                elif kind == "str":
+                    self._cols[name][start:end] = values.astype(object).where(values.notna(), None).to_numpy()
+                elif kind == "int":
+                    self._cols[name][start:end] = pd.to_numeric(values, errors="coerce").fillna(0).to_numpy(np.int64)
+                else:
+                    self._cols[name][start:end] = pd.to_numeric(values, errors="coerce").to_numpy(np.float64)
+            self._n = end
+            self.version += 1
+            for listener in self._listeners:
+                listener.on_rows_added(self, range(start, end))
+            return range(start, end)
+
+    def update(self, row, values):
+        with self.lock:
+            if not 0 <= row < self._n:
+                raise IndexError(row)
+            for listener in self._listeners:
+                listener.on_row_discarded(self, row)
+            for name, value in values.items():
+                kind = self.schema[name]
+                if kind == "cat":
+                    self._cols[name][row] = self._category_code(name, value)
+                else:
+                    self._cols[name][row] = self._coerce(kind, value)
+            self.version += 1
+            for listener in self._listeners:
+                listener.on_rows_added(self, range(row, row + 1))
+
+    # --- 읽기 ---
+    def categories(self, name):
+        return list(self._categories[name])
+
+    def codes(self, name):
+        return self._cols[name][:self._n]
+
+    def column(self, name):
+        kind = self.schema[name]
+        if kind == "cat":
+            return pd.Categorical.from_codes(self.codes(name), categories=self._categories[name], validate=False)
+        return self._cols[name][:self._n]
+
+    def value(self, name, row):
+        kind = self.schema[name]
+        raw = self._cols[name][row]
+        if kind == "cat":
+            return None if raw < 0 else self._categories[name][raw]
+        if kind == "date":
+            return None if np.isnat(raw) else str(pd.Timestamp(raw).date())
+        return raw.item() if hasattr(raw, "item") else raw
+
+    def take(self, rows, columns=None):
+        # 지정한 행만 담은 DataFrame (index = 행 번호), 페이지 표시 / 부분 저장용
+        rows = np.asarray(rows, dtype=np.int64)
+        with self.lock:
+            data = {}
+            for name in (columns or self.schema):
+                kind = self.schema[name]
+                values = self._cols[name][:self._n][rows]
+                if kind == "cat":
+                    values = pd.Categorical.from_codes(values, categories=self._categories[name], validate=False)
+                data[name] = values
+            return pd.DataFrame(data, index=pd.Index(rows, name="No."))
+
+    def frame(self, columns=None):
+        with self.lock:
+            if self._frame_cache is None or self._frame_cache[0] != self.version:
+                with section("frame_build", rows=self._n):
+                    data = {}
+                    for name, kind in self.schema.items():
+                        if kind == "str":
+                            data[name] = pd.Series(self._cols[name][:self._n], dtype=object, copy=False)
+                        else:
+                            data[name] = self.column(name)
+                    self._frame_cache = (self.version, pd.DataFrame(data, copy=False))
+            df = self._frame_cache[1]
+            return df if columns is None else df[[c for c in columns if c in df.columns]]
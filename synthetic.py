@@ -0,0 +1,178 @@
+"""시드 고정 가상 데이터 생성기 (부하 테스트 / 버전 간 성능 비교용).
+
+오더 / 매장 판매 데이터를 기존 목업과 같은 스키마와 분포로 청크 단위로 생성한다.
+같은 (seed, chunk_size) 면 항상 같은 데이터가 나온다.
+
+    python synthetic.py orders 1000000 --seed 7 --out orders.parquet
+    python synthetic.py sales 500000 --seed 7 --storage sqlite:///opp_data.sqlite3
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from costing import DEFAULT_COST_MIX
+
+DEFAULT_FACTORY_INFO = {
+    "베트남(VNM)":      {"Region": "Asia", "Main": 30, "Outsourced": 20, "Currency": "VND"},
+    "인도네시아(IDN)":   {"Region": "Asia", "Main": 25, "Outsourced": 15, "Currency": "IDR"},
+    "미얀마(MMR-내수)":  {"Region": "Asia", "Main": 20, "Outsourced": 10, "Currency": "MMK"},
+    "과테말라(GTM)":     {"Region": "Central America", "Main": 20, "Outsourced": 10, "Currency": "GTQ"},
+    "니카라과(NIC)":     {"Region": "Central America", "Main": 20, "Outsourced": 5, "Currency": "NIO"},
+    "아이티(HTI)":       {"Region": "Central America", "Main": 10, "Outsourced": 5, "Currency": "HTG"}
+}
+
+YEARS = np.array([str(y) for y in range(2016, 2026)], dtype=object)
+DUE_DATES = np.array([f"{y}-06-15" for y in YEARS], dtype=object)
+STYLE_NUMBERS = np.arange(100, 1000)
+# 스타일 코드 "H-연도-번호" 는 조합 수가 적으므로 미리 만들어 두고 인덱스로 조회
+STYLES = np.array([f"H-{y}-{no}" for y in YEARS for no in STYLE_NUMBERS], dtype=object)
+BUYERS = np.array(["Target", "Walmart", "Zara", "Gap", "Uniqlo"], dtype=object)
+FABRICS = np.array(["Woven", "Knit", "Synthetic", "Other"], dtype=object)
+CATEGORIES = np.array(["Ladies", "Men", "Kids", "Toddler"], dtype=object)
+DESTINATIONS = np.array(["USA", "Europe", "Korea", "Japan"], dtype=object)
+SEASONS = np.array(["C1", "C2", "C3"], dtype=object)
+PROD_TYPES = np.array(["Main", "Outsourced"], dtype=object)
+REGIONS = np.array(["North America", "Europe", "Asia Pacific", "Latin America"], dtype=object)
+CHUNK_SIZE = 1_000_000
+COST_MIX_CONCENTRATION = 50
+
+
+def _chunk_rng(seed, kind, index):
+    # 청크마다 독립 스트림 -> 어느 청크부터 읽어도 같은 값
+    return np.random.default_rng([seed, {"orders": 0, "sales": 1}[kind], index])
+
+
+def _pick(rng, values, n):
+    return _cat(values, rng.integers(0, len(values), n))
+
+
+def _cat(values, codes):
+    # 문자열 배열 대신 카테고리로 만들어 대용량에서도 문자열 복사가 없도록 함
+    return pd.Categorical.from_codes(codes, categories=pd.Index(values, dtype=object), validate=False)
+
+
+def _order_chunk(rng, n, factories):
+    year_idx = rng.integers(0, len(YEARS), n)
+    factory_idx = rng.integers(0, len(factories), n)
+    factory = _cat(factories, factory_idx)
+    prod_country = _cat([f.split('(')[0] for f in factories], factory_idx)
+    qty = rng.integers(1000, 50001, n)
+    price = rng.uniform(5.0, 25.0, n)
+    revenue = qty * price
+    cost_ratio = rng.uniform(0.7, 0.9, n)
+    profit = revenue * (1 - cost_ratio)
+    buyers = _pick(rng, BUYERS, n)
+    style_idx = year_idx * len(STYLE_NUMBERS) + rng.integers(0, len(STYLE_NUMBERS), n)
+    df = pd.DataFrame({
+        "바이어": buyers,
+        "스타일": _cat(STYLES, style_idx),
+        "연도": _cat(YEARS, year_idx), "시즌": _pick(rng, SEASONS, n),
+        "복종": _pick(rng, FABRICS, n), "카테고리": _pick(rng, CATEGORIES, n),
+        "생산국가": prod_country, "수출국가": _pick(rng, DESTINATIONS, n),
+        "수량": qty, "단가": np.round(price, 2),
+        "매출($)": np.round(revenue, 2),
+        "영업이익($)": np.round(profit, 2),
+        "이익률(%)": np.round((1 - cost_ratio) * 100, 1),
+        "국가": factory, "생산구분": _pick(rng, PROD_TYPES, n),
+        "납기일": _cat(DUE_DATES, year_idx), "상태": _cat(["Confirmed"], np.zeros(n, dtype=np.int8)),
+        "진행상태": _cat(["Store"], np.zeros(n, dtype=np.int8)),
+    })
+    # 개당 원가 (단가 x 원가율) 를 항목별로 나눔. 기존 컬럼 값이 바뀌지 않도록 난수는 마지막에 뽑는다
+    shares = rng.standard_gamma(np.array(list(DEFAULT_COST_MIX.values())) * COST_MIX_CONCENTRATION, (n, len(DEFAULT_COST_MIX)))
+    shares /= shares.sum(axis=1, keepdims=True)
+    unit_cost = (price * cost_ratio)[:, None] * shares
+    for i, name in enumerate(DEFAULT_COST_MIX):
+        df[name] = np.round(unit_cost[:, i], 4)
+    return df
+
+
+def _sales_chunk(rng, n):
+    sold_qty = rng.integers(500, 40001, n)
+    retail_price = rng.uniform(15.0, 60.0, n)
+    return pd.DataFrame({
+        "연도": _pick(rng, YEARS, n), "바이어": _pick(rng, BUYERS, n),
+        "카테고리": _pick(rng, CATEGORIES, n), "판매지역": _pick(rng, REGIONS, n),
+        "판매량(Qty)": sold_qty, "판매금액($)": np.round(sold_qty * retail_price, 2),
+        "정상가판매율(%)": np.round(rng.uniform(40, 90, n), 1),
+    })
+
+
+def iter_orders(n, seed=0, chunk_size=CHUNK_SIZE, factories=None):
+    factories = list(factories or DEFAULT_FACTORY_INFO)
+    for index, start in enumerate(range(0, n, chunk_size)):
+        yield _order_chunk(_chunk_rng(seed, "orders", index), min(chunk_size, n - start), factories)
+
+
+def iter_sales(n, seed=0, chunk_size=CHUNK_SIZE):
+    for index, start in enumerate(range(0, n, chunk_size)):
+        yield _sales_chunk(_chunk_rng(seed, "sales", index), min(chunk_size, n - start))
+
+
+def generate_orders(n, seed=0, chunk_size=CHUNK_SIZE, factories=None):
+    return pd.concat(iter_orders(n, seed, chunk_size, factories), ignore_index=True) if n else pd.DataFrame()
+
+
+def generate_sales(n, seed=0, chunk_size=CHUNK_SIZE):
+    return pd.concat(iter_sales(n, seed, chunk_size), ignore_index=True) if n else pd.DataFrame()
+
+
+def write_chunks(chunks, path):
+    # 확장자에 따라 parquet (pyarrow) 또는 csv 로 청크를 이어 쓴다
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 오더 / 판매 데이터 생성")
+    parser.add_argument("kind", choices=["orders", "sales"])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="저장할 파일 (.parquet 또는 .csv)")
+    target.add_argument("--storage", help="적재할 저장소 URL (sqlite:///... 또는 parquet:///...)")
+    args = parser.parse_args(argv)
+
+    if args.kind == "orders":
+        chunks = iter_orders(args.rows, args.seed, args.chunk_size)
+    else:
+        chunks = iter_sales(args.rows, args.seed, args.chunk_size)
+    if args.out:
+        write_chunks(chunks, args.out)
+        print(f"{args.rows:,} rows -> {args.out}")
+        return
+    from storage import StoreOutOfDate, open_backend
+    backend = open_backend(args.storage)
+    if backend.is_empty():
+        backend.save_factory_info(DEFAULT_FACTORY_INFO)
+    append = backend.append_orders if args.kind == "orders" else backend.append_sales
+    loaded = backend.count(args.kind)
+    for chunk in chunks:
+        try:
+            append(chunk, loaded)
+        except StoreOutOfDate as e:
+            # 실행 중인 앱이 그 사이에 행을 추가함 -> 그 뒤에 이어서 저장
+            loaded = e.next_row
+            append(chunk, loaded)
+        loaded += len(chunk)
+    print(f"{args.rows:,} rows -> {args.storage} ({loaded:,} total)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
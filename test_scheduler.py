@@ -0,0 +1,64 @@
+"""LineScheduler 증분 재계획(체크포인트 재사용)이 처음부터 다시 계획한 결과와 같은지 확인."""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from scheduler import PROD_TYPES, LineScheduler
+from store import ORDER_SCHEMA, ColumnStore
+from synthetic import DEFAULT_FACTORY_INFO
+
+START = "2026-10-19"
+STATUSES = ["Confirmed", "Estimated", "Cancelled"]
+
+
+def _orders(rng, n):
+    factories = list(DEFAULT_FACTORY_INFO)
+    return pd.DataFrame({
+        "국가": rng.choice(factories, n), "생산구분": rng.choice(PROD_TYPES, n, p=[0.8, 0.2]),
+        "상태": rng.choice(STATUSES, n, p=[0.6, 0.35, 0.05]),
+        "납기일": pd.Timestamp(START) + pd.to_timedelta(rng.integers(-20, 360, n), unit="D"),
+        "수량": rng.integers(1_000, 30_000, n), "사용라인": rng.integers(1, 4, n), "연도": "2026", "바이어": "B",
+    })
+
+
+def _edit(rng, store, factory_info):
+    kind = rng.integers(3)
+    if kind == 0:
+        info = factory_info[rng.choice(list(factory_info))]
+        prod_type = rng.choice(PROD_TYPES)
+        info[prod_type] = max(0, int(info[prod_type] + rng.integers(-8, 9)))
+    elif kind == 1:
+        store.extend(_orders(rng, int(rng.integers(1, 20))))
+    else:
+        row = int(rng.integers(len(store)))
+        values = rng.choice([
+            {"수량": int(rng.integers(1_000, 30_000))},
+            {"납기일": str((pd.Timestamp(START) + pd.Timedelta(days=int(rng.integers(0, 360)))).date())},
+            {"상태": str(rng.choice(STATUSES))},
+            {"국가": str(rng.choice(list(factory_info)))},
+        ])
+        store.update(row, values)
+
+
+def test_incremental_plan_matches_full_plan():
+    rng = np.random.default_rng(0)
+    store = ColumnStore(ORDER_SCHEMA)
+    store.extend(_orders(rng, 3_000))
+    factory_info = copy.deepcopy(DEFAULT_FACTORY_INFO)
+    scheduler = LineScheduler(store)
+    scheduler.plan(factory_info, START)
+
+    partial, fallbacks = 0, 0
+    for _ in range(60):
+        _edit(rng, store, factory_info)
+        schedule, load, replanned = scheduler.plan(factory_info, START)
+        expected, expected_load, _ = LineScheduler(store).plan(factory_info, START)
+        pd.testing.assert_frame_equal(schedule, expected)
+        pd.testing.assert_frame_equal(load, expected_load)
+        partial += replanned < len(schedule)
+        fallbacks += (schedule["상태"] != "정상").any()
+
+    # 체크포인트 재사용과 공장 / 구분 전환이 실제로 일어난 경우를 검증했는지 확인
+    assert partial > 0
+    assert fallbacks > 0